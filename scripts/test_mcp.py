@@ -1,80 +1,90 @@
 #!/usr/bin/env python3
-"""Test MCP server tools directly."""
+"""Test MCP server tools directly.
+
+Requires the package to be installed, e.g. ``pip install -e .``.
+"""
 
 import asyncio
+import os
 import sys
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from mcp_server.tools.azure_insights import (
+    AZURE_SDK_AVAILABLE,
+    ExceptionsQueryInput,
+    _query_exceptions,
+)
+from mcp_server.tools.docker import ListContainersInput, _list_containers
+from mcp_server.tools.kubernetes import ListPodsInput, _list_pods
+from mcp_server.utils.log_filter import filter_logs, split_lines
+
+_BANNER_RULE = "=" * 60
+_SECTION_RULE = "=" * 50
+_PROMPT_RULE = "-" * 60
+
+
+def _section(lines: list[str]) -> None:
+    """Write a whole test section at once so concurrent tests don't interleave."""
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 async def test_docker():
     """Test Docker tools."""
-    print("\n🐳 Docker Test")
-    print("=" * 50)
-
-    from mcp_server.tools.docker import ListContainersInput, _list_containers
+    lines = ["\n🐳 Docker Test", _SECTION_RULE]
 
     try:
         result = await _list_containers(ListContainersInput(all=True), None)
-        print(result[:500] if len(result) > 500 else result)
-        print("✅ Docker works!")
+        lines.append(result[:500] if len(result) > 500 else result)
+        lines.append("✅ Docker works!")
     except Exception as e:
-        print(f"❌ {e}")
+        lines.append(f"❌ {e}")
+
+    _section(lines)
 
 
 async def test_kubernetes():
     """Test Kubernetes tools."""
-    print("\n☸️ Kubernetes Test")
-    print("=" * 50)
-
-    from mcp_server.tools.kubernetes import ListPodsInput, _list_pods
+    lines = ["\n☸️ Kubernetes Test", _SECTION_RULE]
 
     try:
         result = await _list_pods(ListPodsInput(namespace="default"))
-        print(result[:500] if len(result) > 500 else result)
-        print("✅ Kubernetes works!")
+        lines.append(result[:500] if len(result) > 500 else result)
+        lines.append("✅ Kubernetes works!")
     except Exception as e:
-        print(f"❌ {e}")
+        lines.append(f"❌ {e}")
+
+    _section(lines)
 
 
 async def test_azure():
     """Test Azure tools."""
-    print("\n☁️ Azure Application Insights Test")
-    print("=" * 50)
+    lines = ["\n☁️ Azure Application Insights Test", _SECTION_RULE]
 
     try:
-        from mcp_server.tools.azure_insights import AZURE_SDK_AVAILABLE
-
         if not AZURE_SDK_AVAILABLE:
-            print("⚠️  Azure SDK not installed")
-            print("   Run: pip install -e '.[azure]'")
+            lines.append("⚠️  Azure SDK not installed")
+            lines.append("   Run: pip install -e '.[azure]'")
+            _section(lines)
             return
 
-        import os
         if not os.getenv("AZURE_LOG_ANALYTICS_WORKSPACE_ID"):
-            print("⚠️  AZURE_LOG_ANALYTICS_WORKSPACE_ID not set")
+            lines.append("⚠️  AZURE_LOG_ANALYTICS_WORKSPACE_ID not set")
+            _section(lines)
             return
 
-        from mcp_server.tools.azure_insights import (
-            ExceptionsQueryInput, _query_exceptions
-        )
-
         result = await _query_exceptions(
             ExceptionsQueryInput(timespan="PT1H", limit=5)
         )
-        print(result[:500] if len(result) > 500 else result)
-        print("✅ Azure works!")
+        lines.append(result[:500] if len(result) > 500 else result)
+        lines.append("✅ Azure works!")
     except Exception as e:
-        print(f"❌ {e}")
+        lines.append(f"❌ {e}")
+
+    _section(lines)
 
 
 async def test_log_filter():
     """Test log filtering."""
-    print("\n🔍 Log Filter Test")
-    print("=" * 50)
-
-    from mcp_server.utils.log_filter import filter_logs
+    lines = ["\n🔍 Log Filter Test", _SECTION_RULE]
 
     logs = """2024-01-15 10:00:00 INFO Application started
 2024-01-15 10:00:01 DEBUG Loading config
@@ -83,35 +93,56 @@ async def test_log_filter():
 2024-01-15 10:00:04 ERROR Timeout exceeded
 2024-01-15 10:00:05 INFO Connection restored"""
 
-    print("Original logs:")
-    print(logs)
-    print("\nFiltered (min_level='error'):")
-    print(filter_logs(logs, min_level="error"))
-    print("✅ Log filter works!")
+    lines.append("Original logs:")
+    lines.append(logs)
+    log_lines = split_lines(logs)
+    lines.append("\nFiltered (min_level='error'):")
+    lines.append(filter_logs(log_lines, min_level="error"))
+    lines.append("\nFiltered (pattern='connection'):")
+    lines.append(filter_logs(log_lines, pattern="connection"))
+    lines.append("✅ Log filter works!")
+
+    _section(lines)
 
 
 async def main():
-    print("\n" + "=" * 60)
-    print("  🧪 MCP Container Tools - Quick Test")
-    print("=" * 60)
+    _section(["\n" + _BANNER_RULE, "  🧪 MCP Container Tools - Quick Test", _BANNER_RULE])
 
     await test_log_filter()
 
     # Optional tests
-    print("\n" + "-" * 60)
-    if input("Test Docker? [y/N]: ").lower() == 'y':
-        await test_docker()
+    print("\n" + _PROMPT_RULE)
+    answer = input("Select tests (d=Docker, k=Kubernetes, a=Azure, all) [none]: ")
+    choices = set(answer.lower().replace(",", " ").split())
+    if "all" in choices:
+        choices = {"d", "k", "a"}
+
+    tasks = []
+    if "d" in choices:
+        tasks.append(test_docker())
 
-    if input("Test Kubernetes? [y/N]: ").lower() == 'y':
-        await test_kubernetes()
+    if "k" in choices:
+        tasks.append(test_kubernetes())
 
-    if input("Test Azure? [y/N]: ").lower() == 'y':
-        await test_azure()
+    if "a" in choices:
+        tasks.append(test_azure())
 
-    print("\n" + "=" * 60)
-    print("  ✅ Tests completed!")
-    print("=" * 60 + "\n")
+    # Each probe is independent I/O, so run them concurrently
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"❌ {result}")
+
+    _section(["\n" + _BANNER_RULE, "  ✅ Tests completed!", _BANNER_RULE + "\n"])
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None
+
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(main())
@@ -1,68 +1,11 @@
 """Prompt templates for common use cases."""
 
-from mcp.server import Server
-from mcp.types import Prompt, PromptArgument, PromptMessage, TextContent
-
-
-def register_prompt_templates(server: Server) -> None:
-    """Register prompt templates with the server."""
-
-    @server.list_prompts()
-    async def list_prompts() -> list[Prompt]:
-        return [
-            Prompt(
-                name="code_review",
-                description="Generate a code review for the given code",
-                arguments=[
-                    PromptArgument(
-                        name="code",
-                        description="The code to review",
-                        required=True,
-                    ),
-                    PromptArgument(
-                        name="language",
-                        description="Programming language of the code",
-                        required=False,
-                    ),
-                ],
-            ),
-            Prompt(
-                name="explain_error",
-                description="Explain an error message and suggest fixes",
-                arguments=[
-                    PromptArgument(
-                        name="error",
-                        description="The error message to explain",
-                        required=True,
-                    ),
-                    PromptArgument(
-                        name="context",
-                        description="Additional context about the error",
-                        required=False,
-                    ),
-                ],
-            ),
-        ]
+from collections.abc import Callable
 
-    @server.get_prompt()
-    async def get_prompt(name: str, arguments: dict | None) -> list[PromptMessage]:
-        args = arguments or {}
-
-        match name:
-            case "code_review":
-                return _create_code_review_prompt(args)
-            case "explain_error":
-                return _create_explain_error_prompt(args)
-            case _:
-                raise ValueError(f"Unknown prompt: {name}")
-
-
-def _create_code_review_prompt(args: dict) -> list[PromptMessage]:
-    """Create a code review prompt."""
-    code = args.get("code", "")
-    language = args.get("language", "unknown")
+from mcp.server import Server
+from mcp.types import GetPromptResult, Prompt, PromptArgument, PromptMessage, TextContent
 
-    content = f"""Please review the following {language} code and provide feedback on:
+_CODE_REVIEW_TEMPLATE = """Please review the following {language} code and provide feedback on:
 1. Code quality and readability
 2. Potential bugs or issues
 3. Performance considerations
@@ -73,20 +16,7 @@ Code to review:
 {code}
 ```"""
 
-    return [
-        PromptMessage(
-            role="user",
-            content=TextContent(type="text", text=content),
-        )
-    ]
-
-
-def _create_explain_error_prompt(args: dict) -> list[PromptMessage]:
-    """Create an error explanation prompt."""
-    error = args.get("error", "")
-    context = args.get("context", "No additional context provided.")
-
-    content = f"""Please explain the following error and suggest how to fix it:
+_EXPLAIN_ERROR_TEMPLATE = """Please explain the following error and suggest how to fix it:
 
 Error message:
 {error}
@@ -100,9 +30,101 @@ Please provide:
 3. How to fix it
 4. How to prevent it in the future"""
 
-    return [
-        PromptMessage(
-            role="user",
-            content=TextContent(type="text", text=content),
-        )
-    ]
+# Prompt catalog, built once at import
+_PROMPTS = [
+    Prompt(
+        name="code_review",
+        description="Generate a code review for the given code",
+        arguments=[
+            PromptArgument(
+                name="code",
+                description="The code to review",
+                required=True,
+            ),
+            PromptArgument(
+                name="language",
+                description="Programming language of the code",
+                required=False,
+            ),
+        ],
+    ),
+    Prompt(
+        name="explain_error",
+        description="Explain an error message and suggest fixes",
+        arguments=[
+            PromptArgument(
+                name="error",
+                description="The error message to explain",
+                required=True,
+            ),
+            PromptArgument(
+                name="context",
+                description="Additional context about the error",
+                required=False,
+            ),
+        ],
+    ),
+]
+
+
+def register_prompt_templates(server: Server) -> None:
+    """Register prompt templates with the server."""
+
+    @server.list_prompts()
+    async def list_prompts() -> list[Prompt]:
+        return _PROMPTS
+
+    @server.get_prompt()
+    async def get_prompt(name: str, arguments: dict | None) -> GetPromptResult:
+        builder = _PROMPT_BUILDERS.get(name)
+        if builder is None:
+            raise ValueError(f"Unknown prompt: {name}")
+
+        return builder(arguments or {})
+
+
+def _create_code_review_prompt(args: dict) -> GetPromptResult:
+    """Create a code review prompt."""
+    content = _CODE_REVIEW_TEMPLATE.format_map(
+        {
+            "code": args.get("code", ""),
+            "language": args.get("language", "unknown"),
+        }
+    )
+
+    return GetPromptResult(
+        description=f"Code review for {args.get('language', 'unknown')} code",
+        messages=[
+            PromptMessage(
+                role="user",
+                content=TextContent(type="text", text=content),
+            )
+        ],
+    )
+
+
+def _create_explain_error_prompt(args: dict) -> GetPromptResult:
+    """Create an error explanation prompt."""
+    content = _EXPLAIN_ERROR_TEMPLATE.format_map(
+        {
+            "error": args.get("error", ""),
+            "context": args.get("context", "No additional context provided."),
+        }
+    )
+
+    return GetPromptResult(
+        description="Explanation of an error message with suggested fixes",
+        messages=[
+            PromptMessage(
+                role="user",
+                content=TextContent(type="text", text=content),
+            )
+        ],
+    )
+
+
+# Message builder for each prompt name
+_PROMPT_BUILDERS: dict[str, Callable[[dict], GetPromptResult]] = {
+    "code_review": _create_code_review_prompt,
+    "explain_error": _create_explain_error_prompt,
+}
@@ -4,9 +4,14 @@ from mcp.server import Server
 
 from mcp_server.resources.config import register_config_resources
 from mcp_server.resources.data import register_data_resources
+from mcp_server.resources.registry import ResourceRegistry
 
 
 def register_resources(server: Server) -> None:
     """Register all resources with the MCP server."""
-    register_config_resources(server)
-    register_data_resources(server)
+    registry = ResourceRegistry()
+
+    register_config_resources(registry)
+    register_data_resources(registry)
+
+    registry.attach(server)
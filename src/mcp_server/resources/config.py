@@ -1,45 +1,55 @@
 """Configuration resources for exposing server settings."""
 
-import json
+import functools
 import os
+import re
+import time
+from collections.abc import Callable
 
-from mcp.server import Server
-from mcp.types import Resource, TextContent
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.types import Resource
 
+from mcp_server.resources.registry import ResourceRegistry
+from mcp_server.utils.serialization import to_json
 
-def register_config_resources(server: Server) -> None:
+# Environment variable names that should never be exposed
+_SENSITIVE_RE = re.compile(r"KEY|SECRET|PASSWORD|TOKEN|CREDENTIAL", re.IGNORECASE)
+
+# Seconds the serialized environment is reused before being rebuilt
+_ENVIRONMENT_TTL = 5.0
+_environment_cache: tuple[float, str] | None = None
+
+# Resources served by this module, built once at import
+_CONFIG_RESOURCES = [
+    Resource(
+        uri="config://server",
+        name="Server Configuration",
+        description="Current server configuration settings",
+        mimeType="application/json",
+    ),
+    Resource(
+        uri="config://environment",
+        name="Environment Variables",
+        description="Available environment variables (filtered)",
+        mimeType="application/json",
+    ),
+]
+
+
+def register_config_resources(registry: ResourceRegistry) -> None:
     """Register configuration resources with the server."""
 
-    @server.list_resources()
+    @registry.list_resources()
     async def list_resources() -> list[Resource]:
-        return [
-            Resource(
-                uri="config://server",
-                name="Server Configuration",
-                description="Current server configuration settings",
-                mimeType="application/json",
-            ),
-            Resource(
-                uri="config://environment",
-                name="Environment Variables",
-                description="Available environment variables (filtered)",
-                mimeType="application/json",
-            ),
-        ]
-
-    @server.read_resource()
-    async def read_resource(uri: str) -> list[TextContent]:
-        match uri:
-            case "config://server":
-                config = _get_server_config()
-                return [TextContent(type="text", text=json.dumps(config, indent=2))]
-
-            case "config://environment":
-                env_vars = _get_filtered_environment()
-                return [TextContent(type="text", text=json.dumps(env_vars, indent=2))]
-
-            case _:
-                raise ValueError(f"Unknown resource: {uri}")
+        return _CONFIG_RESOURCES
+
+    @registry.read_resource()
+    async def read_resource(uri: str) -> list[ReadResourceContents]:
+        reader = _READERS.get(uri)
+        if reader is None:
+            raise ValueError(f"Unknown resource: {uri}")
+
+        return [ReadResourceContents(content=reader(), mime_type="application/json")]
 
 
 def _get_server_config() -> dict:
@@ -57,13 +67,31 @@ def _get_server_config() -> dict:
 
 def _get_filtered_environment() -> dict:
     """Get environment variables, filtering sensitive ones."""
-    sensitive_patterns = ("KEY", "SECRET", "PASSWORD", "TOKEN", "CREDENTIAL")
+    env = dict(os.environ)
+    sensitive = [key for key in env if _SENSITIVE_RE.search(key)]
+    env.update(dict.fromkeys(sensitive, "***REDACTED***"))
+    return env
+
+
+@functools.cache
+def _get_server_config_json() -> str:
+    """Serialize the server configuration once, as it never changes at runtime."""
+    return to_json(_get_server_config())
+
+
+def _get_environment_json() -> str:
+    """Serialize the filtered environment, reusing the result for a few seconds."""
+    global _environment_cache
+
+    now = time.monotonic()
+    if _environment_cache is None or now - _environment_cache[0] > _ENVIRONMENT_TTL:
+        _environment_cache = (now, to_json(_get_filtered_environment()))
+
+    return _environment_cache[1]
 
-    filtered_env = {}
-    for key, value in os.environ.items():
-        if any(pattern in key.upper() for pattern in sensitive_patterns):
-            filtered_env[key] = "***REDACTED***"
-        else:
-            filtered_env[key] = value
 
-    return filtered_env
+# Serialized document reader for each configuration resource URI
+_READERS: dict[str, Callable[[], str]] = {
+    "config://server": _get_server_config_json,
+    "config://environment": _get_environment_json,
+}
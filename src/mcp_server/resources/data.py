@@ -1,42 +1,70 @@
 """Data resources for exposing structured data."""
 
-import json
-from datetime import UTC, datetime
+import functools
+import time
+from collections.abc import Callable
 
-from mcp.server import Server
-from mcp.types import Resource, TextContent
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.types import Resource
 
+from mcp_server.resources.registry import ResourceRegistry
+from mcp_server.utils.serialization import to_json
 
-def register_data_resources(server: Server) -> None:
+# Placeholder substituted into the pre-serialized status document
+_TIMESTAMP_PLACEHOLDER = "__TIMESTAMP__"
+
+# Resources served by this module, built once at import
+_DATA_RESOURCES = [
+    Resource(
+        uri="data://status",
+        name="Server Status",
+        description="Current server status and health information",
+        mimeType="application/json",
+    ),
+]
+
+
+def register_data_resources(registry: ResourceRegistry) -> None:
     """Register data resources with the server."""
 
-    @server.list_resources()
+    @registry.list_resources()
     async def list_resources() -> list[Resource]:
-        return [
-            Resource(
-                uri="data://status",
-                name="Server Status",
-                description="Current server status and health information",
-                mimeType="application/json",
-            ),
-        ]
-
-    @server.read_resource()
-    async def read_resource(uri: str) -> list[TextContent]:
-        if uri != "data://status":
+        return _DATA_RESOURCES
+
+    @registry.read_resource()
+    async def read_resource(uri: str) -> list[ReadResourceContents]:
+        reader = _READERS.get(uri)
+        if reader is None:
             raise ValueError(f"Unknown resource: {uri}")
 
-        status = _get_server_status()
-        return [TextContent(type="text", text=json.dumps(status, indent=2))]
+        return [ReadResourceContents(content=reader(), mime_type="application/json")]
 
 
-def _get_server_status() -> dict:
+def _get_server_status(timestamp: str) -> dict:
     """Get current server status information."""
     return {
         "status": "running",
-        "timestamp": datetime.now(UTC).isoformat(),
+        "timestamp": timestamp,
         "health": {
             "memory": "ok",
             "connections": "ok",
         },
     }
+
+
+@functools.cache
+def _get_status_template() -> str:
+    """Serialize the status document once, leaving a placeholder for the timestamp."""
+    return to_json(_get_server_status(_TIMESTAMP_PLACEHOLDER))
+
+
+def _get_status_json() -> str:
+    """Render the status document with the current timestamp."""
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    return _get_status_template().replace(_TIMESTAMP_PLACEHOLDER, timestamp, 1)
+
+
+# Serialized document reader for each data resource URI
+_READERS: dict[str, Callable[[], str]] = {
+    "data://status": _get_status_json,
+}
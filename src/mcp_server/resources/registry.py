@@ -0,0 +1,75 @@
+"""Resource registry that merges the handlers of every resource module."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from mcp.server import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.types import Resource
+from pydantic import AnyUrl
+
+ListResourcesHandler = Callable[[], Awaitable[list[Resource]]]
+ReadResourceHandler = Callable[[str], Awaitable[list[ReadResourceContents]]]
+
+
+class ResourceRegistry:
+    """Collect list/read handlers from resource modules behind a single server handler.
+
+    The MCP server keeps only one list_resources and one read_resource handler,
+    so each resource module registers here and reads are routed by URI.
+    """
+
+    def __init__(self) -> None:
+        self._list_handlers: list[ListResourcesHandler] = []
+        self._read_handlers: list[ReadResourceHandler] = []
+        self._owners: dict[str, ReadResourceHandler] = {}
+
+    def list_resources(self) -> Callable[[ListResourcesHandler], ListResourcesHandler]:
+        """Decorator registering a module's list_resources handler."""
+
+        def decorator(func: ListResourcesHandler) -> ListResourcesHandler:
+            self._list_handlers.append(func)
+            return func
+
+        return decorator
+
+    def read_resource(self) -> Callable[[ReadResourceHandler], ReadResourceHandler]:
+        """Decorator registering a module's read_resource handler."""
+
+        def decorator(func: ReadResourceHandler) -> ReadResourceHandler:
+            self._read_handlers.append(func)
+            return func
+
+        return decorator
+
+    async def list_all(self) -> list[Resource]:
+        """List the resources of every module."""
+        results = await asyncio.gather(*(handler() for handler in self._list_handlers))
+
+        resources: list[Resource] = []
+        for resource_list, read_handler in zip(results, self._read_handlers, strict=True):
+            for resource in resource_list:
+                self._owners[str(resource.uri)] = read_handler
+            resources.extend(resource_list)
+        return resources
+
+    async def read(self, uri: str) -> list[ReadResourceContents]:
+        """Dispatch a resource read to the module that provides the URI."""
+        if not self._owners:
+            await self.list_all()
+
+        handler = self._owners.get(uri)
+        if handler is None:
+            raise ValueError(f"Unknown resource: {uri}")
+        return await handler(uri)
+
+    def attach(self, server: Server) -> None:
+        """Register the merged handlers with the MCP server."""
+
+        @server.list_resources()
+        async def list_resources() -> list[Resource]:
+            return await self.list_all()
+
+        @server.read_resource()
+        async def read_resource(uri: AnyUrl) -> list[ReadResourceContents]:
+            return await self.read(str(uri))
@@ -10,6 +10,13 @@ from mcp_server.prompts import register_prompts
 from mcp_server.resources import register_resources
 from mcp_server.tools import register_tools
 
+try:
+    import uvloop
+
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,7 +50,9 @@ def main() -> None:
         level=logging.INFO,
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     )
-    asyncio.run(run_server())
+    loop_factory = uvloop.new_event_loop if UVLOOP_AVAILABLE else None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(run_server())
 
 
 if __name__ == "__main__":
@@ -7,12 +7,17 @@ from mcp_server.tools.docker import register_docker_tools
 from mcp_server.tools.docker_compose import register_compose_tools
 from mcp_server.tools.file_operations import register_file_tools
 from mcp_server.tools.kubernetes import register_kubernetes_tools
+from mcp_server.tools.registry import ToolRegistry
 
 
 def register_tools(server: Server) -> None:
     """Register all tools with the MCP server."""
-    register_file_tools(server)
-    register_docker_tools(server)
-    register_compose_tools(server)
-    register_kubernetes_tools(server)
-    register_azure_insights_tools(server)
+    registry = ToolRegistry()
+
+    register_file_tools(registry)
+    register_docker_tools(registry)
+    register_compose_tools(registry)
+    register_kubernetes_tools(registry)
+    register_azure_insights_tools(registry)
+
+    registry.attach(server)
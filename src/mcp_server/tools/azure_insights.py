@@ -1,28 +1,66 @@
 """Azure Application Insights tools for querying logs and metrics."""
 
-import json
+import functools
 import os
+import re
+from collections.abc import Awaitable, Callable
 from datetime import timedelta
-from typing import Any, Literal
+from typing import Annotated, Any, Literal
 
-from mcp.server import Server
 from mcp.types import TextContent, Tool
-from pydantic import BaseModel, Field
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field
+
+from mcp_server.tools.registry import ToolRegistry
+from mcp_server.utils.batcher import AsyncBatcher
+from mcp_server.utils.cache import TTLCache
+from mcp_server.utils.serialization import to_json
 
 try:
-    from azure.identity import DefaultAzureCredential
-    from azure.monitor.query import LogsQueryClient, MetricsQueryClient
+    import aiohttp  # noqa: F401  (transport required by the async Azure clients)
+    from azure.identity import TokenCachePersistenceOptions
+    from azure.identity.aio import DefaultAzureCredential
+    from azure.monitor.query import LogsBatchQuery, LogsQueryStatus
+    from azure.monitor.query.aio import LogsQueryClient, MetricsQueryClient
 
     AZURE_SDK_AVAILABLE = True
 except ImportError:
     AZURE_SDK_AVAILABLE = False
 
 
+# ISO 8601 durations such as PT1H, PT5M, P1D, P1W or P1DT12H
+_ISO_DURATION_RE = re.compile(
+    r"^P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_timespan(timespan: str) -> timedelta:
+    """Parse ISO 8601 duration to timedelta."""
+    match = _ISO_DURATION_RE.match(timespan)
+    if not match or not any(match.groups()):
+        raise ValueError(f"Invalid ISO 8601 duration: {timespan!r} (e.g. PT1H, P1D, P7D)")
+
+    return timedelta(**{unit: int(value) for unit, value in match.groupdict().items() if value})
+
+
+def _validate_timespan(value: str) -> str:
+    """Reject timespans that are not ISO 8601 durations when the input is validated."""
+    _parse_timespan(value)
+    return value
+
+
+# ISO 8601 duration field, checked once when the tool input is validated
+Timespan = Annotated[str, AfterValidator(_validate_timespan)]
+
+
 class KustoQueryInput(BaseModel):
     """Input schema for running Kusto queries."""
 
+    model_config = ConfigDict(frozen=True)
+
     query: str = Field(description="Kusto query to execute")
-    timespan: str = Field(
+    timespan: Timespan = Field(
         default="PT1H",
         description="ISO 8601 duration (PT1H=1 hour, P1D=1 day, P7D=7 days)",
     )
@@ -35,7 +73,9 @@ class KustoQueryInput(BaseModel):
 class ExceptionsQueryInput(BaseModel):
     """Input schema for querying exceptions."""
 
-    timespan: str = Field(default="PT1H", description="ISO 8601 duration")
+    model_config = ConfigDict(frozen=True)
+
+    timespan: Timespan = Field(default="PT1H", description="ISO 8601 duration")
     limit: int = Field(default=50, description="Maximum number of results")
     severity: Literal["all", "error", "critical"] | None = Field(
         default=None, description="Filter by severity level"
@@ -46,7 +86,9 @@ class ExceptionsQueryInput(BaseModel):
 class TracesQueryInput(BaseModel):
     """Input schema for querying traces."""
 
-    timespan: str = Field(default="PT1H", description="ISO 8601 duration")
+    model_config = ConfigDict(frozen=True)
+
+    timespan: Timespan = Field(default="PT1H", description="ISO 8601 duration")
     limit: int = Field(default=100, description="Maximum number of results")
     severity: Literal["verbose", "info", "warning", "error", "critical"] | None = Field(
         default=None, description="Filter by severity level"
@@ -57,7 +99,9 @@ class TracesQueryInput(BaseModel):
 class RequestsQueryInput(BaseModel):
     """Input schema for querying requests."""
 
-    timespan: str = Field(default="PT1H", description="ISO 8601 duration")
+    model_config = ConfigDict(frozen=True)
+
+    timespan: Timespan = Field(default="PT1H", description="ISO 8601 duration")
     limit: int = Field(default=100, description="Maximum number of results")
     failed_only: bool = Field(default=False, description="Show only failed requests")
     min_duration_ms: int | None = Field(
@@ -69,7 +113,9 @@ class RequestsQueryInput(BaseModel):
 class DependenciesQueryInput(BaseModel):
     """Input schema for querying dependencies."""
 
-    timespan: str = Field(default="PT1H", description="ISO 8601 duration")
+    model_config = ConfigDict(frozen=True)
+
+    timespan: Timespan = Field(default="PT1H", description="ISO 8601 duration")
     limit: int = Field(default=100, description="Maximum number of results")
     failed_only: bool = Field(default=False, description="Show only failed dependencies")
     type_filter: str | None = Field(
@@ -80,11 +126,13 @@ class DependenciesQueryInput(BaseModel):
 class MetricsQueryInput(BaseModel):
     """Input schema for querying metrics."""
 
+    model_config = ConfigDict(frozen=True)
+
     metric_name: str = Field(
         description="Metric name (e.g., requests/count, exceptions/count)"
     )
-    timespan: str = Field(default="PT1H", description="ISO 8601 duration")
-    interval: str = Field(default="PT5M", description="Aggregation interval")
+    timespan: Timespan = Field(default="PT1H", description="ISO 8601 duration")
+    interval: Timespan = Field(default="PT5M", description="Aggregation interval")
     aggregation: Literal["avg", "min", "max", "sum", "count"] = Field(
         default="avg", description="Aggregation type"
     )
@@ -97,32 +145,22 @@ class MetricsQueryInput(BaseModel):
 class AvailabilityQueryInput(BaseModel):
     """Input schema for querying availability tests."""
 
-    timespan: str = Field(default="P1D", description="ISO 8601 duration")
+    model_config = ConfigDict(frozen=True)
+
+    timespan: Timespan = Field(default="P1D", description="ISO 8601 duration")
     limit: int = Field(default=50, description="Maximum number of results")
     test_name: str | None = Field(default=None, description="Filter by test name")
     failed_only: bool = Field(default=False, description="Show only failed tests")
 
 
-def _parse_timespan(timespan: str) -> timedelta:
-    """Parse ISO 8601 duration to timedelta."""
-    # Simple parser for common formats
-    if timespan.startswith("PT"):
-        value = timespan[2:-1]
-        unit = timespan[-1]
-        if unit == "H":
-            return timedelta(hours=int(value))
-        elif unit == "M":
-            return timedelta(minutes=int(value))
-        elif unit == "S":
-            return timedelta(seconds=int(value))
-    elif timespan.startswith("P"):
-        value = timespan[1:-1]
-        unit = timespan[-1]
-        if unit == "D":
-            return timedelta(days=int(value))
-        elif unit == "W":
-            return timedelta(weeks=int(value))
-    return timedelta(hours=1)
+# Escapes for characters with special meaning inside KQL string literals
+_KQL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+# Name of the persistent MSAL token cache shared across server restarts
+_TOKEN_CACHE_NAME = "mcp-container-tools"
+
+# Recent Kusto query results, keyed by (workspace, normalized query, timespan)
+_query_cache: TTLCache[tuple[str, str, str], str] = TTLCache(maxsize=512, ttl=60)
 
 
 def _get_workspace_id(provided: str | None) -> str:
@@ -145,129 +183,180 @@ def _get_resource_id(provided: str | None) -> str:
     return resource_id
 
 
-def _format_table_results(tables: list) -> str:
-    """Format query results as readable text."""
-    if not tables:
-        return "No results found."
+@functools.cache
+def _get_credential() -> "DefaultAzureCredential":
+    """Create the Azure credential once so acquired tokens are reused.
+
+    With AZURE_TOKEN_CACHE_PERSISTENCE enabled, tokens are also kept in the
+    encrypted MSAL cache on disk so they survive server restarts.
+    """
+    if os.getenv("AZURE_TOKEN_CACHE_PERSISTENCE", "").lower() in ("1", "true", "yes"):
+        return DefaultAzureCredential(
+            cache_persistence_options=TokenCachePersistenceOptions(name=_TOKEN_CACHE_NAME)
+        )
+    return DefaultAzureCredential()
 
-    results = []
-    for table in tables:
-        columns = [col.name for col in table.columns]
-        for row in table.rows:
-            record = dict(zip(columns, row, strict=False))
-            results.append(record)
 
-    return json.dumps(results, indent=2, default=str)
+@functools.cache
+def _get_logs_client() -> "LogsQueryClient":
+    """Create the Log Analytics client once so its connection pool is reused."""
+    return LogsQueryClient(_get_credential())
 
 
-def register_azure_insights_tools(server: Server) -> None:
+@functools.cache
+def _get_metrics_client() -> "MetricsQueryClient":
+    """Create the metrics client once so its connection pool is reused."""
+    return MetricsQueryClient(_get_credential())
+
+
+def _kql_string(value: str) -> str:
+    """Quote a value as a KQL string literal so it cannot alter the query."""
+    escaped = value.translate(_KQL_ESCAPES)
+    return f'"{escaped}"'
+
+
+def _normalize_query(query: str) -> str:
+    """Normalize query indentation and blank lines so equivalent queries share a cache key."""
+    return "\n".join(line.strip() for line in query.splitlines() if line.strip())
+
+
+def _format_table_results(tables: list) -> str:
+    """Format query results as JSON, one {"columns", "rows"} object per table.
+
+    A single table is returned as the object itself, several as a list.
+    """
+    if not tables:
+        return "No results found."
+
+    payloads = [
+        {"columns": [col.name for col in table.columns], "rows": [list(row) for row in table.rows]}
+        for table in tables
+    ]
+    return to_json(payloads[0] if len(payloads) == 1 else payloads, default=str)
+
+
+@functools.cache
+def _tools_list() -> list[Tool]:
+    """Build the tool definitions on first use, generating their schemas lazily."""
+    return [
+        Tool(
+            name="azure_query",
+            description="Run a custom Kusto query on Application Insights logs",
+            inputSchema=KustoQueryInput.model_json_schema(),
+        ),
+        Tool(
+            name="azure_exceptions",
+            description="Query application exceptions and errors",
+            inputSchema=ExceptionsQueryInput.model_json_schema(),
+        ),
+        Tool(
+            name="azure_traces",
+            description="Query application traces and logs",
+            inputSchema=TracesQueryInput.model_json_schema(),
+        ),
+        Tool(
+            name="azure_requests",
+            description="Query HTTP requests to your application",
+            inputSchema=RequestsQueryInput.model_json_schema(),
+        ),
+        Tool(
+            name="azure_dependencies",
+            description="Query external dependencies (HTTP, SQL, etc.)",
+            inputSchema=DependenciesQueryInput.model_json_schema(),
+        ),
+        Tool(
+            name="azure_metrics",
+            description="Query Application Insights metrics",
+            inputSchema=MetricsQueryInput.model_json_schema(),
+        ),
+        Tool(
+            name="azure_availability",
+            description="Query availability test results",
+            inputSchema=AvailabilityQueryInput.model_json_schema(),
+        ),
+    ]
+
+
+def register_azure_insights_tools(registry: ToolRegistry) -> None:
     """Register Azure Application Insights tools with the server."""
 
-    @server.list_tools()
+    @registry.list_tools()
     async def list_tools() -> list[Tool]:
-        return [
-            Tool(
-                name="azure_query",
-                description="Run a custom Kusto query on Application Insights logs",
-                inputSchema=KustoQueryInput.model_json_schema(),
-            ),
-            Tool(
-                name="azure_exceptions",
-                description="Query application exceptions and errors",
-                inputSchema=ExceptionsQueryInput.model_json_schema(),
-            ),
-            Tool(
-                name="azure_traces",
-                description="Query application traces and logs",
-                inputSchema=TracesQueryInput.model_json_schema(),
-            ),
-            Tool(
-                name="azure_requests",
-                description="Query HTTP requests to your application",
-                inputSchema=RequestsQueryInput.model_json_schema(),
-            ),
-            Tool(
-                name="azure_dependencies",
-                description="Query external dependencies (HTTP, SQL, etc.)",
-                inputSchema=DependenciesQueryInput.model_json_schema(),
-            ),
-            Tool(
-                name="azure_metrics",
-                description="Query Application Insights metrics",
-                inputSchema=MetricsQueryInput.model_json_schema(),
-            ),
-            Tool(
-                name="azure_availability",
-                description="Query availability test results",
-                inputSchema=AvailabilityQueryInput.model_json_schema(),
-            ),
-        ]
+        return _tools_list()
 
-    @server.call_tool()
+    @registry.call_tool()
     async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
         if not AZURE_SDK_AVAILABLE:
             return [
                 TextContent(
                     type="text",
-                    text="Azure SDK not installed. Run: pip install azure-identity azure-monitor-query",  # noqa: E501
+                    text="Azure SDK not installed. Run: pip install 'mcp-container-tools[azure]'",
                 )
             ]
 
-        match name:
-            case "azure_query":
-                input_data = KustoQueryInput.model_validate(arguments)
-                output = await _run_kusto_query(input_data)
-                return [TextContent(type="text", text=output)]
-
-            case "azure_exceptions":
-                input_data = ExceptionsQueryInput.model_validate(arguments)
-                output = await _query_exceptions(input_data)
-                return [TextContent(type="text", text=output)]
-
-            case "azure_traces":
-                input_data = TracesQueryInput.model_validate(arguments)
-                output = await _query_traces(input_data)
-                return [TextContent(type="text", text=output)]
+        handler = _TOOL_HANDLERS.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown tool: {name}")
 
-            case "azure_requests":
-                input_data = RequestsQueryInput.model_validate(arguments)
-                output = await _query_requests(input_data)
-                return [TextContent(type="text", text=output)]
+        model, run = handler
+        output = await run(model.model_validate(arguments))
+        return [TextContent(type="text", text=output)]
 
-            case "azure_dependencies":
-                input_data = DependenciesQueryInput.model_validate(arguments)
-                output = await _query_dependencies(input_data)
-                return [TextContent(type="text", text=output)]
 
-            case "azure_metrics":
-                input_data = MetricsQueryInput.model_validate(arguments)
-                output = await _query_metrics(input_data)
-                return [TextContent(type="text", text=output)]
+async def _run_kusto_query(input_data: KustoQueryInput) -> str:
+    """Run a custom Kusto query."""
+    workspace_id = _get_workspace_id(input_data.workspace_id)
+    cache_key = (workspace_id, _normalize_query(input_data.query), input_data.timespan)
+    cached = _query_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-            case "azure_availability":
-                input_data = AvailabilityQueryInput.model_validate(arguments)
-                output = await _query_availability(input_data)
-                return [TextContent(type="text", text=output)]
+    output, complete = await _kusto_batcher.submit(
+        (workspace_id, input_data.query, input_data.timespan)
+    )
+    # Partial results are truncated, so a later call should run the query again
+    if complete:
+        _query_cache.set(cache_key, output)
+    return output
 
-            case _:
-                raise ValueError(f"Unknown tool: {name}")
 
+async def _run_kusto_batch(
+    queries: list[tuple[str, str, str]],
+) -> list[tuple[str, bool] | BaseException]:
+    """Run (workspace_id, query, timespan) Kusto queries in a single batch request.
 
-async def _run_kusto_query(input_data: KustoQueryInput) -> str:
-    """Run a custom Kusto query."""
-    credential = DefaultAzureCredential()
-    client = LogsQueryClient(credential)
+    Each result is the formatted output and whether the query completed.
+    """
+    client = _get_logs_client()
+
+    results = await client.query_batch(
+        [
+            LogsBatchQuery(
+                workspace_id=workspace_id,
+                query=query,
+                timespan=_parse_timespan(timespan),
+            )
+            for workspace_id, query, timespan in queries
+        ]
+    )
 
-    workspace_id = _get_workspace_id(input_data.workspace_id)
-    timespan = _parse_timespan(input_data.timespan)
+    outputs: list[tuple[str, bool] | BaseException] = []
+    for result in results:
+        if result.status == LogsQueryStatus.FAILURE:
+            outputs.append(RuntimeError(f"Kusto query failed: {result.message}"))
+        elif result.status == LogsQueryStatus.PARTIAL:
+            reason = result.partial_error.message if result.partial_error else "unknown error"
+            warning = f"Partial results, Kusto query failed: {reason}"
+            outputs.append((f"{warning}\n\n{_format_table_results(result.partial_data)}", False))
+        else:
+            outputs.append((_format_table_results(result.tables), True))
+    return outputs
 
-    response = client.query_workspace(
-        workspace_id=workspace_id,
-        query=input_data.query,
-        timespan=timespan,
-    )
 
-    return _format_table_results(response.tables)
+# Queries issued within a few milliseconds of each other share one batch request
+_kusto_batcher: AsyncBatcher[tuple[str, str, str], tuple[str, bool]] = AsyncBatcher(
+    _run_kusto_batch, max_batch_size=10, max_queue_time=0.005
+)
 
 
 async def _query_exceptions(input_data: ExceptionsQueryInput) -> str:
@@ -280,7 +369,7 @@ async def _query_exceptions(input_data: ExceptionsQueryInput) -> str:
         where_clauses.append("severityLevel >= 4")
 
     if input_data.search:
-        where_clauses.append(f'outerMessage contains "{input_data.search}"')
+        where_clauses.append(f"outerMessage contains {_kql_string(input_data.search)}")
 
     where_str = " and ".join(where_clauses) if where_clauses else "1==1"
 
@@ -308,7 +397,7 @@ async def _query_traces(input_data: TracesQueryInput) -> str:
         where_clauses.append(f"severityLevel == {level}")
 
     if input_data.search:
-        where_clauses.append(f'message contains "{input_data.search}"')
+        where_clauses.append(f"message contains {_kql_string(input_data.search)}")
 
     where_str = " and ".join(where_clauses) if where_clauses else "1==1"
 
@@ -336,7 +425,7 @@ async def _query_requests(input_data: RequestsQueryInput) -> str:
         where_clauses.append(f"duration > {input_data.min_duration_ms}")
 
     if input_data.url_filter:
-        where_clauses.append(f'url contains "{input_data.url_filter}"')
+        where_clauses.append(f"url contains {_kql_string(input_data.url_filter)}")
 
     where_str = " and ".join(where_clauses) if where_clauses else "1==1"
 
@@ -362,7 +451,7 @@ async def _query_dependencies(input_data: DependenciesQueryInput) -> str:
         where_clauses.append("success == false")
 
     if input_data.type_filter:
-        where_clauses.append(f'type == "{input_data.type_filter}"')
+        where_clauses.append(f"type == {_kql_string(input_data.type_filter)}")
 
     where_str = " and ".join(where_clauses) if where_clauses else "1==1"
 
@@ -382,14 +471,13 @@ async def _query_dependencies(input_data: DependenciesQueryInput) -> str:
 
 async def _query_metrics(input_data: MetricsQueryInput) -> str:
     """Query Application Insights metrics."""
-    credential = DefaultAzureCredential()
-    client = MetricsQueryClient(credential)
+    client = _get_metrics_client()
 
     resource_id = _get_resource_id(input_data.resource_id)
     timespan = _parse_timespan(input_data.timespan)
     interval = _parse_timespan(input_data.interval)
 
-    response = client.query_resource(
+    response = await client.query_resource(
         resource_uri=resource_id,
         metric_names=[input_data.metric_name],
         timespan=timespan,
@@ -406,7 +494,7 @@ async def _query_metrics(input_data: MetricsQueryInput) -> str:
                     {"timestamp": data.timestamp.isoformat(), "value": value}
                 )
 
-    return json.dumps(results, indent=2)
+    return to_json(results)
 
 
 async def _query_availability(input_data: AvailabilityQueryInput) -> str:
@@ -414,7 +502,7 @@ async def _query_availability(input_data: AvailabilityQueryInput) -> str:
     where_clauses = []
 
     if input_data.test_name:
-        where_clauses.append(f'name == "{input_data.test_name}"')
+        where_clauses.append(f"name == {_kql_string(input_data.test_name)}")
 
     if input_data.failed_only:
         where_clauses.append("success == false")
@@ -432,3 +520,15 @@ async def _query_availability(input_data: AvailabilityQueryInput) -> str:
     return await _run_kusto_query(
         KustoQueryInput(query=query, timespan=input_data.timespan)
     )
+
+
+# Input model and handler for each Azure tool
+_TOOL_HANDLERS: dict[str, tuple[type[BaseModel], Callable[[Any], Awaitable[str]]]] = {
+    "azure_query": (KustoQueryInput, _run_kusto_query),
+    "azure_exceptions": (ExceptionsQueryInput, _query_exceptions),
+    "azure_traces": (TracesQueryInput, _query_traces),
+    "azure_requests": (RequestsQueryInput, _query_requests),
+    "azure_dependencies": (DependenciesQueryInput, _query_dependencies),
+    "azure_metrics": (MetricsQueryInput, _query_metrics),
+    "azure_availability": (AvailabilityQueryInput, _query_availability),
+}
@@ -1,18 +1,26 @@
 """Docker tools for container management and log reading."""
 
 import asyncio
+import functools
+import re
+import shlex
+from collections.abc import Awaitable, Callable
 from typing import Any, Literal
 
-from mcp.server import Server
 from mcp.types import TextContent, Tool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
+from mcp_server.tools.registry import ToolRegistry
+from mcp_server.utils.batcher import AsyncBatcher
 from mcp_server.utils.log_filter import filter_logs
+from mcp_server.utils.process import stream_lines
 
 
 class LogFilterInput(BaseModel):
     """Input schema for log filtering options."""
 
+    model_config = ConfigDict(frozen=True)
+
     min_level: Literal["trace", "debug", "info", "warn", "error", "fatal"] | None = Field(
         default=None, description="Minimum log level to show"
     )
@@ -25,6 +33,8 @@ class LogFilterInput(BaseModel):
 class ContainerLogsInput(BaseModel):
     """Input schema for reading container logs."""
 
+    model_config = ConfigDict(frozen=True)
+
     container: str = Field(description="Container name or ID")
     tail: int = Field(default=100, description="Number of lines to show from the end")
     since: str | None = Field(default=None, description="Show logs since (e.g., '10m', '1h')")
@@ -41,12 +51,24 @@ class ContainerLogsInput(BaseModel):
 class ListContainersInput(BaseModel):
     """Input schema for listing containers."""
 
+    model_config = ConfigDict(frozen=True)
+
     all: bool = Field(default=False, description="Show all containers (default shows only running)")
 
 
+class ContainerInspectInput(BaseModel):
+    """Input schema for inspecting a container."""
+
+    model_config = ConfigDict(frozen=True)
+
+    container: str = Field(description="Container name or ID")
+
+
 class ContainerExecInput(BaseModel):
     """Input schema for executing command in container."""
 
+    model_config = ConfigDict(frozen=True)
+
     container: str = Field(description="Container name or ID")
     command: str = Field(description="Command to execute")
 
@@ -54,98 +76,94 @@ class ContainerExecInput(BaseModel):
 class DockerHost(BaseModel):
     """Docker host configuration."""
 
+    model_config = ConfigDict(frozen=True)
+
     host: str | None = Field(default=None, description="Docker host (e.g., 'ssh://user@remote', 'tcp://host:2375')")
 
 
-def register_docker_tools(server: Server) -> None:
+def _with_host(model: type[BaseModel]) -> dict[str, Any]:
+    """Build a tool input schema that also accepts a Docker host."""
+    schema = model.model_json_schema()
+    return {
+        **schema,
+        "properties": {
+            **schema.get("properties", {}),
+            **DockerHost.model_json_schema().get("properties", {}),
+        },
+    }
+
+
+# Characters that need a shell to interpret (pipes, redirects, expansions, ...)
+_SHELL_SYNTAX_RE = re.compile(r"[|&;<>()$`*?\[\]{}~!#\n]")
+
+# Builtins and keywords that only exist inside a shell, so they cannot be exec'd
+_SHELL_BUILTINS = frozenset({
+    ".", ":", "alias", "bg", "break", "case", "cd", "command", "continue", "eval", "exec",
+    "exit", "export", "fc", "fg", "for", "getopts", "hash", "if", "jobs", "read", "readonly",
+    "return", "set", "shift", "source", "times", "trap", "type", "ulimit", "umask",
+    "unalias", "unset", "until", "wait", "while",
+})
+
+
+@functools.cache
+def _tools_list() -> list[Tool]:
+    """Build the tool definitions on first use, generating their schemas lazily."""
+    return [
+        Tool(
+            name="docker_logs",
+            description="Read logs from a Docker container (local or remote)",
+            inputSchema=_with_host(ContainerLogsInput),
+        ),
+        Tool(
+            name="docker_ps",
+            description="List Docker containers (local or remote)",
+            inputSchema=_with_host(ListContainersInput),
+        ),
+        Tool(
+            name="docker_inspect",
+            description="Get detailed information about a container",
+            inputSchema=_with_host(ContainerInspectInput),
+        ),
+        Tool(
+            name="docker_exec",
+            description="Execute a command inside a running container",
+            inputSchema=_with_host(ContainerExecInput),
+        ),
+    ]
+
+
+def register_docker_tools(registry: ToolRegistry) -> None:
     """Register Docker tools with the server."""
 
-    @server.list_tools()
+    @registry.list_tools()
     async def list_tools() -> list[Tool]:
-        return [
-            Tool(
-                name="docker_logs",
-                description="Read logs from a Docker container (local or remote)",
-                inputSchema={
-                    **ContainerLogsInput.model_json_schema(),
-                    "properties": {
-                        **ContainerLogsInput.model_json_schema().get("properties", {}),
-                        **DockerHost.model_json_schema().get("properties", {}),
-                    },
-                },
-            ),
-            Tool(
-                name="docker_ps",
-                description="List Docker containers (local or remote)",
-                inputSchema={
-                    **ListContainersInput.model_json_schema(),
-                    "properties": {
-                        **ListContainersInput.model_json_schema().get("properties", {}),
-                        **DockerHost.model_json_schema().get("properties", {}),
-                    },
-                },
-            ),
-            Tool(
-                name="docker_inspect",
-                description="Get detailed information about a container",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "container": {"type": "string", "description": "Container name or ID"},
-                        "host": {"type": "string", "description": "Docker host (optional)"},
-                    },
-                    "required": ["container"],
-                },
-            ),
-            Tool(
-                name="docker_exec",
-                description="Execute a command inside a running container",
-                inputSchema={
-                    **ContainerExecInput.model_json_schema(),
-                    "properties": {
-                        **ContainerExecInput.model_json_schema().get("properties", {}),
-                        **DockerHost.model_json_schema().get("properties", {}),
-                    },
-                },
-            ),
-        ]
-
-    @server.call_tool()
-    async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
-        host = arguments.get("host")
-
-        match name:
-            case "docker_logs":
-                input_data = ContainerLogsInput.model_validate(arguments)
-                output = await _get_container_logs(input_data, host)
-                return [TextContent(type="text", text=output)]
+        return _tools_list()
 
-            case "docker_ps":
-                input_data = ListContainersInput.model_validate(arguments)
-                output = await _list_containers(input_data, host)
-                return [TextContent(type="text", text=output)]
+    @registry.call_tool()
+    async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
+        handler = _TOOL_HANDLERS.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown tool: {name}")
 
-            case "docker_inspect":
-                container = arguments["container"]
-                output = await _inspect_container(container, host)
-                return [TextContent(type="text", text=output)]
+        model, run = handler
+        output = await run(model.model_validate(arguments), arguments.get("host"))
+        return [TextContent(type="text", text=output)]
 
-            case "docker_exec":
-                input_data = ContainerExecInput.model_validate(arguments)
-                output = await _exec_in_container(input_data, host)
-                return [TextContent(type="text", text=output)]
 
-            case _:
-                raise ValueError(f"Unknown tool: {name}")
+def _compile_pattern(pattern: str | None) -> re.Pattern[str] | None:
+    """Compile a user-supplied log pattern once, before filtering starts."""
+    return re.compile(pattern, re.IGNORECASE) if pattern else None
 
 
 def _build_docker_command(host: str | None, *args: str) -> list[str]:
     """Build docker command with optional remote host."""
-    cmd = ["docker"]
-    if host:
-        cmd.extend(["--host", host])
-    cmd.extend(args)
-    return cmd
+    return [*_docker_prefix(host), *args]
+
+
+@functools.lru_cache(maxsize=16)
+def _docker_prefix(host: str | None) -> tuple[str, ...]:
+    """Docker invocation for a host, built once per distinct host."""
+    return ("docker", "--host", host) if host else ("docker",)
 
 
 async def _run_docker_command(cmd: list[str]) -> str:
@@ -158,10 +176,21 @@ async def _run_docker_command(cmd: list[str]) -> str:
     stdout, stderr = await process.communicate()
 
     if process.returncode != 0:
-        error_msg = stderr.decode().strip()
+        error_msg = stderr.decode("utf-8", errors="replace").strip()
         raise RuntimeError(f"Docker command failed: {error_msg}")
 
-    return stdout.decode()
+    return stdout.decode("utf-8", errors="replace")
+
+
+async def _run_docker_commands(cmds: list[tuple[str, ...]]) -> list[str | BaseException]:
+    """Execute a batch of distinct docker commands concurrently."""
+    return await asyncio.gather(
+        *(_run_docker_command(list(cmd)) for cmd in cmds), return_exceptions=True
+    )
+
+
+# Coalesces concurrent read-only listings so identical ones spawn docker once
+_listing_batcher: AsyncBatcher[tuple[str, ...], str] = AsyncBatcher(_run_docker_commands)
 
 
 async def _get_container_logs(input_data: ContainerLogsInput, host: str | None) -> str:
@@ -175,19 +204,20 @@ async def _get_container_logs(input_data: ContainerLogsInput, host: str | None)
 
     cmd.append(input_data.container)
 
-    output = await _run_docker_command(cmd)
+    # Read the log line by line rather than buffering and splitting it whole
+    lines = [line async for line in stream_lines(cmd, "Docker command failed")]
 
     # Apply filtering if any filter options are set
     if input_data.min_level or input_data.pattern or input_data.exclude_pattern:
-        output = filter_logs(
-            output,
+        return filter_logs(
+            lines,
             min_level=input_data.min_level,
-            pattern=input_data.pattern,
-            exclude_pattern=input_data.exclude_pattern,
+            pattern=_compile_pattern(input_data.pattern),
+            exclude_pattern=_compile_pattern(input_data.exclude_pattern),
             context_lines=input_data.context_lines,
         )
 
-    return output
+    return "\n".join(lines)
 
 
 async def _list_containers(input_data: ListContainersInput, host: str | None) -> str:
@@ -199,17 +229,40 @@ async def _list_containers(input_data: ListContainersInput, host: str | None) ->
 
     cmd.extend(["--format", "table {{.ID}}\t{{.Names}}\t{{.Image}}\t{{.Status}}\t{{.Ports}}"])
 
-    return await _run_docker_command(cmd)
+    return await _listing_batcher.submit(tuple(cmd))
 
 
-async def _inspect_container(container: str, host: str | None) -> str:
+async def _inspect_container(input_data: ContainerInspectInput, host: str | None) -> str:
     """Get detailed container information."""
-    cmd = _build_docker_command(host, "inspect", container)
+    cmd = _build_docker_command(host, "inspect", input_data.container)
     return await _run_docker_command(cmd)
 
 
 async def _exec_in_container(input_data: ContainerExecInput, host: str | None) -> str:
     """Execute command in a container."""
     cmd = _build_docker_command(host, "exec", input_data.container)
-    cmd.extend(["sh", "-c", input_data.command])
+    cmd.extend(_exec_argv(input_data.command))
     return await _run_docker_command(cmd)
+
+
+def _exec_argv(command: str) -> list[str]:
+    """Split a command into argv, falling back to sh -c when it needs a shell."""
+    if _SHELL_SYNTAX_RE.search(command):
+        return ["sh", "-c", command]
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return ["sh", "-c", command]
+    # Leading VAR=value assignments and builtins are only understood by a shell
+    if not argv or "=" in argv[0] or argv[0] in _SHELL_BUILTINS:
+        return ["sh", "-c", command]
+    return argv
+
+
+# Input model and handler for each Docker tool
+_TOOL_HANDLERS: dict[str, tuple[type[BaseModel], Callable[[Any, str | None], Awaitable[str]]]] = {
+    "docker_logs": (ContainerLogsInput, _get_container_logs),
+    "docker_ps": (ListContainersInput, _list_containers),
+    "docker_inspect": (ContainerInspectInput, _inspect_container),
+    "docker_exec": (ContainerExecInput, _exec_in_container),
+}
@@ -1,16 +1,22 @@
 """Docker Compose tools for service management and logs."""
 
 import asyncio
+import functools
+from collections.abc import Awaitable, Callable
 from typing import Any
 
-from mcp.server import Server
 from mcp.types import TextContent, Tool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from mcp_server.tools.registry import ToolRegistry
+from mcp_server.utils.process import stream_lines
 
 
 class ComposeLogsInput(BaseModel):
     """Input schema for reading compose service logs."""
 
+    model_config = ConfigDict(frozen=True)
+
     service: str | None = Field(default=None, description="Service name (omit for all services)")
     tail: int = Field(default=100, description="Number of lines to show from the end")
     since: str | None = Field(default=None, description="Show logs since (e.g., '10m', '1h')")
@@ -21,6 +27,8 @@ class ComposeLogsInput(BaseModel):
 class ComposeServicesInput(BaseModel):
     """Input schema for listing compose services."""
 
+    model_config = ConfigDict(frozen=True)
+
     project_dir: str | None = Field(default=None, description="Path to docker-compose.yml dir")
     all: bool = Field(default=False, description="Show all services (including stopped)")
 
@@ -28,73 +36,61 @@ class ComposeServicesInput(BaseModel):
 class ComposeServiceActionInput(BaseModel):
     """Input schema for service actions."""
 
+    model_config = ConfigDict(frozen=True)
+
     service: str | None = Field(default=None, description="Service name (omit for all)")
     project_dir: str | None = Field(default=None, description="Path to docker-compose.yml dir")
 
 
-def register_compose_tools(server: Server) -> None:
+@functools.cache
+def _tools_list() -> list[Tool]:
+    """Build the tool definitions on first use, generating their schemas lazily."""
+    action_schema = ComposeServiceActionInput.model_json_schema()
+    return [
+        Tool(
+            name="compose_logs",
+            description="Read logs from Docker Compose services",
+            inputSchema=ComposeLogsInput.model_json_schema(),
+        ),
+        Tool(
+            name="compose_ps",
+            description="List Docker Compose services and their status",
+            inputSchema=ComposeServicesInput.model_json_schema(),
+        ),
+        Tool(
+            name="compose_up",
+            description="Start Docker Compose services",
+            inputSchema=action_schema,
+        ),
+        Tool(
+            name="compose_down",
+            description="Stop Docker Compose services",
+            inputSchema=action_schema,
+        ),
+        Tool(
+            name="compose_restart",
+            description="Restart Docker Compose services",
+            inputSchema=action_schema,
+        ),
+    ]
+
+
+def register_compose_tools(registry: ToolRegistry) -> None:
     """Register Docker Compose tools with the server."""
 
-    @server.list_tools()
+    @registry.list_tools()
     async def list_tools() -> list[Tool]:
-        return [
-            Tool(
-                name="compose_logs",
-                description="Read logs from Docker Compose services",
-                inputSchema=ComposeLogsInput.model_json_schema(),
-            ),
-            Tool(
-                name="compose_ps",
-                description="List Docker Compose services and their status",
-                inputSchema=ComposeServicesInput.model_json_schema(),
-            ),
-            Tool(
-                name="compose_up",
-                description="Start Docker Compose services",
-                inputSchema=ComposeServiceActionInput.model_json_schema(),
-            ),
-            Tool(
-                name="compose_down",
-                description="Stop Docker Compose services",
-                inputSchema=ComposeServiceActionInput.model_json_schema(),
-            ),
-            Tool(
-                name="compose_restart",
-                description="Restart Docker Compose services",
-                inputSchema=ComposeServiceActionInput.model_json_schema(),
-            ),
-        ]
-
-    @server.call_tool()
-    async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
-        match name:
-            case "compose_logs":
-                input_data = ComposeLogsInput.model_validate(arguments)
-                output = await _get_compose_logs(input_data)
-                return [TextContent(type="text", text=output)]
-
-            case "compose_ps":
-                input_data = ComposeServicesInput.model_validate(arguments)
-                output = await _list_compose_services(input_data)
-                return [TextContent(type="text", text=output)]
+        return _tools_list()
 
-            case "compose_up":
-                input_data = ComposeServiceActionInput.model_validate(arguments)
-                output = await _compose_action("up", input_data)
-                return [TextContent(type="text", text=output)]
-
-            case "compose_down":
-                input_data = ComposeServiceActionInput.model_validate(arguments)
-                output = await _compose_action("down", input_data)
-                return [TextContent(type="text", text=output)]
-
-            case "compose_restart":
-                input_data = ComposeServiceActionInput.model_validate(arguments)
-                output = await _compose_action("restart", input_data)
-                return [TextContent(type="text", text=output)]
+    @registry.call_tool()
+    async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
+        handler = _TOOL_HANDLERS.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown tool: {name}")
 
-            case _:
-                raise ValueError(f"Unknown tool: {name}")
+        model, run = handler
+        output = await run(model.model_validate(arguments))
+        return [TextContent(type="text", text=output)]
 
 
 async def _run_compose_command(cmd: list[str], cwd: str | None = None) -> str:
@@ -108,10 +104,28 @@ async def _run_compose_command(cmd: list[str], cwd: str | None = None) -> str:
     stdout, stderr = await process.communicate()
 
     if process.returncode != 0:
-        error_msg = stderr.decode().strip()
+        error_msg = stderr.decode("utf-8", errors="replace").strip()
         raise RuntimeError(f"Docker Compose command failed: {error_msg}")
 
-    return stdout.decode()
+    return stdout.decode("utf-8", errors="replace")
+
+
+async def _run_compose_action_command(cmd: list[str], cwd: str | None = None) -> str:
+    """Execute a compose action whose stdout is unused and return its progress output."""
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+    )
+    _, stderr = await process.communicate()
+    progress = stderr.decode("utf-8", errors="replace").strip()
+
+    if process.returncode != 0:
+        raise RuntimeError(f"Docker Compose command failed: {progress}")
+
+    # Compose reports progress (e.g. "Container web  Started") on stderr
+    return progress or "OK"
 
 
 async def _get_compose_logs(input_data: ComposeLogsInput) -> str:
@@ -129,7 +143,8 @@ async def _get_compose_logs(input_data: ComposeLogsInput) -> str:
     if input_data.service:
         cmd.append(input_data.service)
 
-    return await _run_compose_command(cmd, input_data.project_dir)
+    lines = stream_lines(cmd, "Docker Compose command failed", cwd=input_data.project_dir)
+    return "\n".join([line async for line in lines])
 
 
 async def _list_compose_services(input_data: ComposeServicesInput) -> str:
@@ -155,4 +170,14 @@ async def _compose_action(action: str, input_data: ComposeServiceActionInput) ->
     if input_data.service:
         cmd.append(input_data.service)
 
-    return await _run_compose_command(cmd, input_data.project_dir)
+    return await _run_compose_action_command(cmd, input_data.project_dir)
+
+
+# Input model and handler for each Compose tool
+_TOOL_HANDLERS: dict[str, tuple[type[BaseModel], Callable[[Any], Awaitable[str]]]] = {
+    "compose_logs": (ComposeLogsInput, _get_compose_logs),
+    "compose_ps": (ComposeServicesInput, _list_compose_services),
+    "compose_up": (ComposeServiceActionInput, functools.partial(_compose_action, "up")),
+    "compose_down": (ComposeServiceActionInput, functools.partial(_compose_action, "down")),
+    "compose_restart": (ComposeServiceActionInput, functools.partial(_compose_action, "restart")),
+}
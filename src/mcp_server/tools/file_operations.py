@@ -1,62 +1,80 @@
 """File operation tools for reading and listing files."""
 
+import asyncio
+import functools
+import os
+from collections.abc import Awaitable, Callable
 from pathlib import Path
 from typing import Any
 
-from mcp.server import Server
 from mcp.types import TextContent, Tool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from mcp_server.tools.registry import ToolRegistry
 
 
 class ReadFileInput(BaseModel):
     """Input schema for reading a file."""
 
+    model_config = ConfigDict(frozen=True)
+
     path: str = Field(description="Path to the file to read")
 
 
 class ListDirectoryInput(BaseModel):
     """Input schema for listing directory contents."""
 
+    model_config = ConfigDict(frozen=True)
+
     path: str = Field(description="Path to the directory to list")
 
 
-def register_file_tools(server: Server) -> None:
+# Largest file read_file returns in full; bigger files are truncated
+_MAX_READ_BYTES = 8 * 1024 * 1024
+
+
+@functools.cache
+def _tools_list() -> list[Tool]:
+    """Build the tool definitions on first use, generating their schemas lazily."""
+    return [
+        Tool(
+            name="read_file",
+            description="Read the contents of a file",
+            inputSchema=ReadFileInput.model_json_schema(),
+        ),
+        Tool(
+            name="list_directory",
+            description="List contents of a directory",
+            inputSchema=ListDirectoryInput.model_json_schema(),
+        ),
+    ]
+
+
+def register_file_tools(registry: ToolRegistry) -> None:
     """Register file operation tools with the server."""
 
-    @server.list_tools()
+    @registry.list_tools()
     async def list_tools() -> list[Tool]:
-        return [
-            Tool(
-                name="read_file",
-                description="Read the contents of a file",
-                inputSchema=ReadFileInput.model_json_schema(),
-            ),
-            Tool(
-                name="list_directory",
-                description="List contents of a directory",
-                inputSchema=ListDirectoryInput.model_json_schema(),
-            ),
-        ]
-
-    @server.call_tool()
+        return _tools_list()
+
+    @registry.call_tool()
     async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
-        match name:
-            case "read_file":
-                input_data = ReadFileInput.model_validate(arguments)
-                content = _read_file(input_data.path)
-                return [TextContent(type="text", text=content)]
+        handler = _TOOL_HANDLERS.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown tool: {name}")
 
-            case "list_directory":
-                input_data = ListDirectoryInput.model_validate(arguments)
-                content = _list_directory(input_data.path)
-                return [TextContent(type="text", text=content)]
+        model, run = handler
+        output = await run(model.model_validate(arguments))
+        return [TextContent(type="text", text=output)]
 
-            case _:
-                raise ValueError(f"Unknown tool: {name}")
 
+async def _read_file(input_data: ReadFileInput) -> str:
+    """Read and return file contents without blocking the event loop."""
+    return await asyncio.to_thread(_read_file_sync, input_data.path)
 
-def _read_file(path: str) -> str:
-    """Read and return file contents."""
+
+def _read_file_sync(path: str) -> str:
+    """Read file contents, truncating files larger than _MAX_READ_BYTES."""
     file_path = Path(path)
 
     if not file_path.exists():
@@ -65,10 +83,23 @@ def _read_file(path: str) -> str:
     if not file_path.is_file():
         raise ValueError(f"Path is not a file: {path}")
 
-    return file_path.read_text(encoding="utf-8")
+    with file_path.open("rb") as f:
+        data = f.read(_MAX_READ_BYTES + 1)
+
+    if len(data) <= _MAX_READ_BYTES:
+        return data.decode("utf-8")
+
+    # The cut may split a multi-byte character, so decode the head leniently
+    head = data[:_MAX_READ_BYTES].decode("utf-8", errors="replace")
+    return f"{head}\n... (truncated at {_MAX_READ_BYTES // (1024 * 1024)} MiB)"
+
 
+async def _list_directory(input_data: ListDirectoryInput) -> str:
+    """List directory contents without blocking the event loop."""
+    return await asyncio.to_thread(_list_directory_sync, input_data.path)
 
-def _list_directory(path: str) -> str:
+
+def _list_directory_sync(path: str) -> str:
     """List directory contents and return as formatted string."""
     dir_path = Path(path)
 
@@ -78,10 +109,19 @@ def _list_directory(path: str) -> str:
     if not dir_path.is_dir():
         raise ValueError(f"Path is not a directory: {path}")
 
+    # scandir reports entry types from the directory listing, so only sizes need a stat
     entries = []
-    for entry in sorted(dir_path.iterdir()):
-        entry_type = "dir" if entry.is_dir() else "file"
-        size = entry.stat().st_size if entry.is_file() else "-"
-        entries.append(f"{entry_type}\t{size}\t{entry.name}")
+    with os.scandir(dir_path) as it:
+        for entry in sorted(it, key=lambda entry: entry.name):
+            entry_type = "dir" if entry.is_dir() else "file"
+            size = entry.stat().st_size if entry.is_file() else "-"
+            entries.append(f"{entry_type}\t{size}\t{entry.name}")
 
     return "\n".join(entries) if entries else "(empty directory)"
+
+
+# Input model and handler for each file tool
+_TOOL_HANDLERS: dict[str, tuple[type[BaseModel], Callable[[Any], Awaitable[str]]]] = {
+    "read_file": (ReadFileInput, _read_file),
+    "list_directory": (ListDirectoryInput, _list_directory),
+}
@@ -1,18 +1,26 @@
 """Kubernetes tools for pod management and log reading."""
 
 import asyncio
+import functools
+from collections.abc import Awaitable, Callable
 from typing import Any, Literal
 
-from mcp.server import Server
 from mcp.types import TextContent, Tool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
+from mcp_server.tools.registry import ToolRegistry
+from mcp_server.utils.batcher import AsyncBatcher
+from mcp_server.utils.cache import TTLCache
 from mcp_server.utils.log_filter import filter_logs
+from mcp_server.utils.process import stream_lines
+from mcp_server.utils.serialization import from_json
 
 
 class K8sContext(BaseModel):
     """Kubernetes context configuration."""
 
+    model_config = ConfigDict(frozen=True)
+
     context: str | None = Field(default=None, description="Kubernetes context to use")
     namespace: str = Field(default="default", description="Kubernetes namespace")
 
@@ -20,6 +28,8 @@ class K8sContext(BaseModel):
 class PodLogsInput(BaseModel):
     """Input schema for reading pod logs."""
 
+    model_config = ConfigDict(frozen=True)
+
     pod: str = Field(description="Pod name (supports wildcards like 'my-app-*')")
     container: str | None = Field(default=None, description="Container name (multi-container pods)")
     namespace: str = Field(default="default", description="Kubernetes namespace")
@@ -39,6 +49,8 @@ class PodLogsInput(BaseModel):
 class ListPodsInput(BaseModel):
     """Input schema for listing pods."""
 
+    model_config = ConfigDict(frozen=True)
+
     namespace: str = Field(default="default", description="K8s namespace ('all' for all)")
     context: str | None = Field(default=None, description="Kubernetes context")
     selector: str | None = Field(default=None, description="Label selector (e.g., 'app=nginx')")
@@ -47,6 +59,8 @@ class ListPodsInput(BaseModel):
 class PodActionInput(BaseModel):
     """Input schema for pod actions."""
 
+    model_config = ConfigDict(frozen=True)
+
     pod: str = Field(description="Pod name")
     namespace: str = Field(default="default", description="Kubernetes namespace")
     context: str | None = Field(default=None, description="Kubernetes context")
@@ -55,6 +69,8 @@ class PodActionInput(BaseModel):
 class PodExecInput(BaseModel):
     """Input schema for executing commands in pods."""
 
+    model_config = ConfigDict(frozen=True)
+
     pod: str = Field(description="Pod name")
     command: str = Field(description="Command to execute")
     container: str | None = Field(default=None, description="Container name (multi-container pods)")
@@ -62,9 +78,17 @@ class PodExecInput(BaseModel):
     context: str | None = Field(default=None, description="Kubernetes context")
 
 
+class ListContextsInput(BaseModel):
+    """Input schema for listing contexts."""
+
+    model_config = ConfigDict(frozen=True)
+
+
 class DeploymentLogsInput(BaseModel):
     """Input schema for reading deployment logs."""
 
+    model_config = ConfigDict(frozen=True)
+
     deployment: str = Field(description="Deployment name")
     namespace: str = Field(default="default", description="Kubernetes namespace")
     context: str | None = Field(default=None, description="Kubernetes context")
@@ -78,92 +102,75 @@ class DeploymentLogsInput(BaseModel):
     exclude_pattern: str | None = Field(default=None, description="Regex pattern to exclude")
 
 
-def register_kubernetes_tools(server: Server) -> None:
+@functools.cache
+def _tools_list() -> list[Tool]:
+    """Build the tool definitions on first use, generating their schemas lazily."""
+    pod_action_schema = PodActionInput.model_json_schema()
+    return [
+        Tool(
+            name="k8s_logs",
+            description="Read logs from a Kubernetes pod",
+            inputSchema=PodLogsInput.model_json_schema(),
+        ),
+        Tool(
+            name="k8s_deployment_logs",
+            description="Read logs from all pods in a deployment",
+            inputSchema=DeploymentLogsInput.model_json_schema(),
+        ),
+        Tool(
+            name="k8s_pods",
+            description="List Kubernetes pods",
+            inputSchema=ListPodsInput.model_json_schema(),
+        ),
+        Tool(
+            name="k8s_describe",
+            description="Get detailed information about a pod",
+            inputSchema=pod_action_schema,
+        ),
+        Tool(
+            name="k8s_exec",
+            description="Execute a command in a pod",
+            inputSchema=PodExecInput.model_json_schema(),
+        ),
+        Tool(
+            name="k8s_events",
+            description="Get events for a namespace or pod",
+            inputSchema=pod_action_schema,
+        ),
+        Tool(
+            name="k8s_contexts",
+            description="List available Kubernetes contexts",
+            inputSchema=ListContextsInput.model_json_schema(),
+        ),
+    ]
+
+
+def register_kubernetes_tools(registry: ToolRegistry) -> None:
     """Register Kubernetes tools with the server."""
 
-    @server.list_tools()
+    @registry.list_tools()
     async def list_tools() -> list[Tool]:
-        return [
-            Tool(
-                name="k8s_logs",
-                description="Read logs from a Kubernetes pod",
-                inputSchema=PodLogsInput.model_json_schema(),
-            ),
-            Tool(
-                name="k8s_deployment_logs",
-                description="Read logs from all pods in a deployment",
-                inputSchema=DeploymentLogsInput.model_json_schema(),
-            ),
-            Tool(
-                name="k8s_pods",
-                description="List Kubernetes pods",
-                inputSchema=ListPodsInput.model_json_schema(),
-            ),
-            Tool(
-                name="k8s_describe",
-                description="Get detailed information about a pod",
-                inputSchema=PodActionInput.model_json_schema(),
-            ),
-            Tool(
-                name="k8s_exec",
-                description="Execute a command in a pod",
-                inputSchema=PodExecInput.model_json_schema(),
-            ),
-            Tool(
-                name="k8s_events",
-                description="Get events for a namespace or pod",
-                inputSchema=PodActionInput.model_json_schema(),
-            ),
-            Tool(
-                name="k8s_contexts",
-                description="List available Kubernetes contexts",
-                inputSchema={"type": "object", "properties": {}},
-            ),
-        ]
-
-    @server.call_tool()
-    async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
-        match name:
-            case "k8s_logs":
-                input_data = PodLogsInput.model_validate(arguments)
-                output = await _get_pod_logs(input_data)
-                return [TextContent(type="text", text=output)]
-
-            case "k8s_deployment_logs":
-                input_data = DeploymentLogsInput.model_validate(arguments)
-                output = await _get_deployment_logs(input_data)
-                return [TextContent(type="text", text=output)]
-
-            case "k8s_pods":
-                input_data = ListPodsInput.model_validate(arguments)
-                output = await _list_pods(input_data)
-                return [TextContent(type="text", text=output)]
-
-            case "k8s_describe":
-                input_data = PodActionInput.model_validate(arguments)
-                output = await _describe_pod(input_data)
-                return [TextContent(type="text", text=output)]
-
-            case "k8s_exec":
-                input_data = PodExecInput.model_validate(arguments)
-                output = await _exec_in_pod(input_data)
-                return [TextContent(type="text", text=output)]
-
-            case "k8s_events":
-                input_data = PodActionInput.model_validate(arguments)
-                output = await _get_events(input_data)
-                return [TextContent(type="text", text=output)]
+        return _tools_list()
 
-            case "k8s_contexts":
-                output = await _list_contexts()
-                return [TextContent(type="text", text=output)]
+    @registry.call_tool()
+    async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
+        handler = _TOOL_HANDLERS.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown tool: {name}")
 
-            case _:
-                raise ValueError(f"Unknown tool: {name}")
+        model, run = handler
+        output = await run(model.model_validate(arguments))
+        return [TextContent(type="text", text=output)]
 
 
 def _build_kubectl_command(context: str | None, namespace: str | None, *args: str) -> list[str]:
     """Build kubectl command with context and namespace."""
+    return [*_kubectl_prefix(context, namespace), *args]
+
+
+@functools.lru_cache(maxsize=128)
+def _kubectl_prefix(context: str | None, namespace: str | None) -> tuple[str, ...]:
+    """kubectl invocation for a context and namespace, built once per distinct pair."""
     cmd = ["kubectl"]
 
     if context:
@@ -174,8 +181,7 @@ def _build_kubectl_command(context: str | None, namespace: str | None, *args: st
     elif namespace == "all":
         cmd.append("--all-namespaces")
 
-    cmd.extend(args)
-    return cmd
+    return tuple(cmd)
 
 
 async def _run_kubectl_command(cmd: list[str]) -> str:
@@ -188,10 +194,27 @@ async def _run_kubectl_command(cmd: list[str]) -> str:
     stdout, stderr = await process.communicate()
 
     if process.returncode != 0:
-        error_msg = stderr.decode().strip()
+        error_msg = stderr.decode("utf-8", errors="replace").strip()
         raise RuntimeError(f"kubectl command failed: {error_msg}")
 
-    return stdout.decode()
+    return stdout.decode("utf-8", errors="replace")
+
+
+async def _run_kubectl_commands(cmds: list[tuple[str, ...]]) -> list[str | BaseException]:
+    """Execute a batch of distinct kubectl commands concurrently."""
+    return await asyncio.gather(
+        *(_run_kubectl_command(list(cmd)) for cmd in cmds), return_exceptions=True
+    )
+
+
+# Most kubectl logs processes one deployment logs call runs at once
+_POD_LOGS_CONCURRENCY = 16
+
+# Recent deployment pod selectors, keyed by (context, namespace, deployment)
+_selector_cache: TTLCache[tuple[str | None, str, str], str] = TTLCache(maxsize=128, ttl=30)
+
+# Coalesces concurrent read-only listings so identical ones spawn kubectl once
+_listing_batcher: AsyncBatcher[tuple[str, ...], str] = AsyncBatcher(_run_kubectl_commands)
 
 
 async def _get_pod_logs(input_data: PodLogsInput) -> str:
@@ -211,66 +234,108 @@ async def _get_pod_logs(input_data: PodLogsInput) -> str:
 
     cmd.append(input_data.pod)
 
-    output = await _run_kubectl_command(cmd)
+    lines = [line async for line in stream_lines(cmd, "kubectl command failed")]
 
     # Apply filtering
     if input_data.min_level or input_data.pattern or input_data.exclude_pattern:
-        output = filter_logs(
-            output,
+        return filter_logs(
+            lines,
             min_level=input_data.min_level,
             pattern=input_data.pattern,
             exclude_pattern=input_data.exclude_pattern,
             context_lines=input_data.context_lines,
         )
 
-    return output
+    return "\n".join(lines)
 
 
 async def _get_deployment_logs(input_data: DeploymentLogsInput) -> str:
     """Get logs from all pods in a deployment."""
     # First, get pods for the deployment
-    selector_cmd = _build_kubectl_command(
+    selector = await _get_deployment_selector(
+        input_data.context, input_data.namespace, input_data.deployment
+    )
+
+    pods_cmd = _build_kubectl_command(
         input_data.context,
         input_data.namespace,
-        "get", "deployment", input_data.deployment,
-        "-o", "jsonpath={.spec.selector.matchLabels}"
+        "get", "pods",
+        f"--selector={selector}",
+        "-o", "name",
     )
+    pods = (await _run_kubectl_command(pods_cmd)).split()
 
-    import json
-    labels_output = await _run_kubectl_command(selector_cmd)
+    if not pods:
+        return f"No pods found for deployment {input_data.deployment}"
 
-    # Parse labels and build selector
-    try:
-        labels = json.loads(labels_output.replace("'", '"'))
-        selector = ",".join(f"{k}={v}" for k, v in labels.items())
-    except json.JSONDecodeError:
-        selector = f"app={input_data.deployment}"
+    # Read every pod's logs concurrently, a bounded number at a time
+    semaphore = asyncio.Semaphore(_POD_LOGS_CONCURRENCY)
+    results = await asyncio.gather(
+        *(_get_prefixed_pod_logs(input_data, pod, semaphore) for pod in pods),
+        return_exceptions=True,
+    )
+
+    lines: list[str] = []
+    errors: list[str] = []
+    for pod, result in zip(pods, results, strict=True):
+        if isinstance(result, BaseException):
+            errors.append(f"[{pod}] {result}")
+        else:
+            lines.extend(result)
 
-    # Get logs from all pods with selector
+    if len(errors) == len(pods):
+        raise RuntimeError("\n".join(errors))
+
+    # Apply filtering to the log lines only, so pod errors are always reported
+    output = "\n".join(lines)
+    if input_data.min_level or input_data.pattern or input_data.exclude_pattern:
+        output = filter_logs(
+            lines,
+            min_level=input_data.min_level,
+            pattern=input_data.pattern,
+            exclude_pattern=input_data.exclude_pattern,
+        )
+
+    return "\n".join([output, *errors]) if output else "\n".join(errors)
+
+
+async def _get_prefixed_pod_logs(
+    input_data: DeploymentLogsInput, pod: str, semaphore: asyncio.Semaphore
+) -> list[str]:
+    """Get one pod's logs with each line prefixed by the pod name."""
     cmd = _build_kubectl_command(
         input_data.context,
         input_data.namespace,
-        "logs",
-        f"--selector={selector}",
+        "logs", pod,
         "--tail", str(input_data.tail),
-        "--prefix",  # Add pod name prefix to each line
     )
 
     if input_data.since:
         cmd.extend(["--since", input_data.since])
 
+    async with semaphore:
+        return [f"[{pod}] {line}" async for line in stream_lines(cmd, "kubectl command failed")]
+
+
+async def _get_deployment_selector(context: str | None, namespace: str, deployment: str) -> str:
+    """Build a label selector matching the pods of a deployment."""
+    cache_key = (context, namespace, deployment)
+    cached = _selector_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    cmd = _build_kubectl_command(context, namespace, "get", "deployment", deployment, "-o", "json")
     output = await _run_kubectl_command(cmd)
 
-    # Apply filtering
-    if input_data.min_level or input_data.pattern or input_data.exclude_pattern:
-        output = filter_logs(
-            output,
-            min_level=input_data.min_level,
-            pattern=input_data.pattern,
-            exclude_pattern=input_data.exclude_pattern,
-        )
+    try:
+        labels = from_json(output)["spec"]["selector"]["matchLabels"]
+        selector = ",".join(f"{k}={v}" for k, v in labels.items())
+    except (ValueError, KeyError, TypeError, AttributeError):
+        # Not cached, so the next call retries the lookup
+        return f"app={deployment}"
 
-    return output
+    _selector_cache.set(cache_key, selector)
+    return selector
 
 
 async def _list_pods(input_data: ListPodsInput) -> str:
@@ -282,7 +347,7 @@ async def _list_pods(input_data: ListPodsInput) -> str:
 
     cmd.extend(["-o", "wide"])
 
-    return await _run_kubectl_command(cmd)
+    return await _listing_batcher.submit(tuple(cmd))
 
 
 async def _describe_pod(input_data: PodActionInput) -> str:
@@ -326,7 +391,19 @@ async def _get_events(input_data: PodActionInput) -> str:
     return await _run_kubectl_command(cmd)
 
 
-async def _list_contexts() -> str:
+async def _list_contexts(input_data: ListContextsInput) -> str:
     """List available Kubernetes contexts."""
     cmd = ["kubectl", "config", "get-contexts"]
     return await _run_kubectl_command(cmd)
+
+
+# Input model and handler for each Kubernetes tool
+_TOOL_HANDLERS: dict[str, tuple[type[BaseModel], Callable[[Any], Awaitable[str]]]] = {
+    "k8s_logs": (PodLogsInput, _get_pod_logs),
+    "k8s_deployment_logs": (DeploymentLogsInput, _get_deployment_logs),
+    "k8s_pods": (ListPodsInput, _list_pods),
+    "k8s_describe": (PodActionInput, _describe_pod),
+    "k8s_exec": (PodExecInput, _exec_in_pod),
+    "k8s_events": (PodActionInput, _get_events),
+    "k8s_contexts": (ListContextsInput, _list_contexts),
+}
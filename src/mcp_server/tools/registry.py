@@ -0,0 +1,74 @@
+"""Tool registry that merges the handlers of every tool module."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from mcp.server import Server
+from mcp.types import TextContent, Tool
+
+ListToolsHandler = Callable[[], Awaitable[list[Tool]]]
+CallToolHandler = Callable[[str, dict[str, Any]], Awaitable[list[TextContent]]]
+
+
+class ToolRegistry:
+    """Collect list/call handlers from tool modules behind a single server handler.
+
+    The MCP server keeps only one list_tools and one call_tool handler, so each
+    tool module registers here instead and the registry fans out to all of them.
+    """
+
+    def __init__(self) -> None:
+        self._list_handlers: list[ListToolsHandler] = []
+        self._call_handlers: list[CallToolHandler] = []
+        self._owners: dict[str, CallToolHandler] = {}
+
+    def list_tools(self) -> Callable[[ListToolsHandler], ListToolsHandler]:
+        """Decorator registering a module's list_tools handler."""
+
+        def decorator(func: ListToolsHandler) -> ListToolsHandler:
+            self._list_handlers.append(func)
+            return func
+
+        return decorator
+
+    def call_tool(self) -> Callable[[CallToolHandler], CallToolHandler]:
+        """Decorator registering a module's call_tool handler."""
+
+        def decorator(func: CallToolHandler) -> CallToolHandler:
+            self._call_handlers.append(func)
+            return func
+
+        return decorator
+
+    async def list_all(self) -> list[Tool]:
+        """List the tools of every module, querying the modules concurrently."""
+        results = await asyncio.gather(*(handler() for handler in self._list_handlers))
+
+        tools: list[Tool] = []
+        for tool_list, call_handler in zip(results, self._call_handlers, strict=True):
+            for tool in tool_list:
+                self._owners[tool.name] = call_handler
+            tools.extend(tool_list)
+        return tools
+
+    async def call(self, name: str, arguments: dict[str, Any]) -> list[TextContent]:
+        """Dispatch a tool call to the module that provides the tool."""
+        if not self._owners:
+            await self.list_all()
+
+        handler = self._owners.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown tool: {name}")
+        return await handler(name, arguments)
+
+    def attach(self, server: Server) -> None:
+        """Register the merged handlers with the MCP server."""
+
+        @server.list_tools()
+        async def list_tools() -> list[Tool]:
+            return await self.list_all()
+
+        @server.call_tool()
+        async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
+            return await self.call(name, arguments)
@@ -1,5 +1,6 @@
 """Utility modules for MCP server."""
 
-from mcp_server.utils.log_filter import LogFilter, LogLevel
+from mcp_server.utils.log_filter import LogFilter, LogLevel, split_lines
+from mcp_server.utils.serialization import from_json, to_json
 
-__all__ = ["LogFilter", "LogLevel"]
+__all__ = ["LogFilter", "LogLevel", "from_json", "split_lines", "to_json"]
@@ -0,0 +1,84 @@
+"""Async batching for concurrent calls that hit the same backend."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Sequence
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class AsyncBatcher(Generic[K, T]):
+    """Group calls submitted within a short window and process them as one batch.
+
+    Calls are queued for up to ``max_queue_time`` seconds, or until
+    ``max_batch_size`` distinct keys are pending. Calls with the same key in a
+    batch are processed once and share the result. ``process_batch`` receives
+    the distinct keys and returns one result or exception per key, in order.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[list[K]], Awaitable[Sequence[T | BaseException]]],
+        max_batch_size: int = 8,
+        max_queue_time: float = 0.01,
+    ):
+        self._process_batch = process_batch
+        self._max_batch_size = max_batch_size
+        self._max_queue_time = max_queue_time
+        self._pending: dict[K, list[asyncio.Future[T]]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task[None]] = set()
+
+    async def submit(self, key: K) -> T:
+        """Queue a call and wait for the result of its batch."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[T] = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._max_queue_time, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Hand the pending calls to a background batch task."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: dict[K, list[asyncio.Future[T]]]) -> None:
+        """Process one batch and resolve the futures waiting on it."""
+        keys = list(batch)
+        try:
+            try:
+                results = await self._process_batch(keys)
+            except Exception as e:
+                results = [e] * len(keys)
+
+            if len(results) != len(keys):
+                error = RuntimeError(f"Batch returned {len(results)} results for {len(keys)} keys")
+                results = [error] * len(keys)
+
+            for key, result in zip(keys, results, strict=True):
+                for future in batch[key]:
+                    if future.done():
+                        continue
+                    if isinstance(result, BaseException):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+        finally:
+            # Never leave a caller waiting, e.g. when the batch task is cancelled
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.cancel()
@@ -1,6 +1,9 @@
 """Log filtering utilities for processing container logs."""
 
+import functools
 import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass
 from enum import Enum
 
@@ -16,14 +19,19 @@ class LogLevel(str, Enum):
     FATAL = "fatal"
 
 
-# Patterns to detect log levels in various formats
+# Keywords that mark each log level in various formats
+LOG_LEVEL_TOKENS = {
+    LogLevel.TRACE: ("TRACE", "trace", "TRC"),
+    LogLevel.DEBUG: ("DEBUG", "debug", "DBG"),
+    LogLevel.INFO: ("INFO", "info", "INF"),
+    LogLevel.WARN: ("WARN", "WARNING", "warn", "warning", "WRN"),
+    LogLevel.ERROR: ("ERROR", "error", "ERR"),
+    LogLevel.FATAL: ("FATAL", "fatal", "CRITICAL", "critical", "FTL"),
+}
+
+# Patterns to detect log levels anywhere in a line
 LOG_LEVEL_PATTERNS = {
-    LogLevel.TRACE: re.compile(r"\b(TRACE|trace|TRC)\b"),
-    LogLevel.DEBUG: re.compile(r"\b(DEBUG|debug|DBG)\b"),
-    LogLevel.INFO: re.compile(r"\b(INFO|info|INF)\b"),
-    LogLevel.WARN: re.compile(r"\b(WARN|WARNING|warn|warning|WRN)\b"),
-    LogLevel.ERROR: re.compile(r"\b(ERROR|error|ERR)\b"),
-    LogLevel.FATAL: re.compile(r"\b(FATAL|fatal|CRITICAL|critical|FTL)\b"),
+    level: re.compile(rf"\b({'|'.join(tokens)})\b") for level, tokens in LOG_LEVEL_TOKENS.items()
 }
 
 # Log level severity order
@@ -36,14 +44,36 @@ LOG_LEVEL_SEVERITY = {
     LogLevel.FATAL: 5,
 }
 
+# All level keywords in one pass; the named group of the leftmost match is the level
+_LEVEL_RE = re.compile(
+    r"\b(?:"
+    + "|".join(
+        f"(?P<{level.value}>{'|'.join(tokens)})" for level, tokens in LOG_LEVEL_TOKENS.items()
+    )
+    + r")\b"
+)
+
+# Severity of each level group in _LEVEL_RE, indexed by match.lastindex
+_GROUP_SEVERITY = (None, *(LOG_LEVEL_SEVERITY[level] for level in LOG_LEVEL_TOKENS))
+
+# Severity of each keyword, for lines that start with one (e.g. "INFO ...", "[ERROR] ...")
+_LEADING_TOKEN_SEVERITY = {
+    token: LOG_LEVEL_SEVERITY[level]
+    for level, tokens in LOG_LEVEL_TOKENS.items()
+    for token in tokens
+}
+
+# Punctuation commonly wrapped around a leading level keyword
+_TOKEN_PUNCTUATION = "[]():|<>"
+
 
 @dataclass
 class FilterOptions:
     """Options for log filtering."""
 
     min_level: LogLevel | None = None
-    pattern: str | None = None
-    exclude_pattern: str | None = None
+    pattern: str | re.Pattern[str] | None = None
+    exclude_pattern: str | re.Pattern[str] | None = None
     case_sensitive: bool = False
     context_lines: int = 0
 
@@ -53,85 +83,145 @@ class LogFilter:
 
     def __init__(self, options: FilterOptions):
         self.options = options
-        self._include_regex: re.Pattern | None = None
-        self._exclude_regex: re.Pattern | None = None
+        self._include_regex: re.Pattern[str] | None = None
+        self._exclude_regex: re.Pattern[str] | None = None
+        self._min_severity: int | None = None
 
         flags = 0 if options.case_sensitive else re.IGNORECASE
 
         if options.pattern:
-            self._include_regex = re.compile(options.pattern, flags)
+            self._include_regex = _compile(options.pattern, flags)
 
         if options.exclude_pattern:
-            self._exclude_regex = re.compile(options.exclude_pattern, flags)
-
-    def filter(self, log_output: str) -> str:
-        """Filter log output based on options."""
-        lines = log_output.splitlines()
-        filtered_lines: list[str] = []
-        context_buffer: list[str] = []
-
-        for i, line in enumerate(lines):
-            if self._should_include(line):
-                # Add context lines before match
-                if self.options.context_lines > 0:
-                    for ctx_line in context_buffer[-self.options.context_lines :]:
-                        if ctx_line not in filtered_lines:
-                            filtered_lines.append(ctx_line)
-
-                filtered_lines.append(line)
-
-                # Add context lines after match
-                if self.options.context_lines > 0:
-                    for j in range(1, self.options.context_lines + 1):
-                        if i + j < len(lines):
-                            next_line = lines[i + j]
-                            if next_line not in filtered_lines:
-                                filtered_lines.append(next_line)
+            self._exclude_regex = _compile(options.exclude_pattern, flags)
+
+        if options.min_level:
+            self._min_severity = LOG_LEVEL_SEVERITY[options.min_level]
+
+        self._should_include = self._make_predicate()
+
+    def filter(self, log_output: str | list[str]) -> str:
+        """Filter log output based on options.
+
+        Accepts either raw log text or lines already split with split_lines(),
+        so several filters can run over the same log without re-splitting it.
+        """
+        lines = split_lines(log_output) if isinstance(log_output, str) else log_output
+        return "\n".join(self.filter_iter(lines))
+
+    def filter_iter(self, lines: Iterable[str]) -> Iterator[str]:
+        """Yield matching lines with their context, in a single pass over the input.
+
+        Only the last context_lines unmatched lines are held, so lines can be
+        consumed as they arrive. Each input line is yielded at most once.
+        """
+        should_include = self._should_include
+        before: deque[str] = deque(maxlen=self.options.context_lines)
+        after_remaining = 0
+
+        for line in lines:
+            if should_include(line):
+                # Flush context lines before match
+                yield from before
+                before.clear()
+                yield line
+                after_remaining = self.options.context_lines
+            elif after_remaining > 0:
+                # Context line after match
+                yield line
+                after_remaining -= 1
             else:
-                context_buffer.append(line)
-                if len(context_buffer) > self.options.context_lines:
-                    context_buffer.pop(0)
-
-        return "\n".join(filtered_lines)
-
-    def _should_include(self, line: str) -> bool:
-        """Check if a line should be included based on filters."""
-        # Check exclude pattern first
-        if self._exclude_regex and self._exclude_regex.search(line):
-            return False
-
-        # Check include pattern
-        if self._include_regex and not self._include_regex.search(line):
-            return False
-
-        # Check log level
-        if self.options.min_level:
-            line_level = self._detect_log_level(line)
-            if line_level:
-                min_severity = LOG_LEVEL_SEVERITY[self.options.min_level]
-                line_severity = LOG_LEVEL_SEVERITY[line_level]
-                if line_severity < min_severity:
+                before.append(line)
+
+    def _make_predicate(self) -> Callable[[str], bool]:
+        """Build the per-line check, running only the filters that are configured.
+
+        The regex search methods are bound once here, so the per-line calls
+        skip the attribute lookups and the checks for unset filters.
+        """
+        exclude = self._exclude_regex.search if self._exclude_regex else None
+        include = self._include_regex.search if self._include_regex else None
+        min_severity = self._min_severity
+
+        if min_severity is not None:
+
+            def should_include(line: str) -> bool:
+                if exclude and exclude(line):
                     return False
+                if include and not include(line):
+                    return False
+                severity = _detect_severity(line)
+                return severity is None or severity >= min_severity
+
+        elif exclude and include:
+
+            def should_include(line: str) -> bool:
+                return not exclude(line) and include(line) is not None
 
-        return True
+        elif exclude:
 
-    def _detect_log_level(self, line: str) -> LogLevel | None:
-        """Detect log level from a log line."""
-        for level, pattern in LOG_LEVEL_PATTERNS.items():
-            if pattern.search(line):
-                return level
+            def should_include(line: str) -> bool:
+                return exclude(line) is None
+
+        elif include:
+
+            def should_include(line: str) -> bool:
+                return include(line) is not None
+
+        else:
+
+            def should_include(line: str) -> bool:
+                return True
+
+        return should_include
+
+
+def _detect_severity(line: str) -> int | None:
+    """Detect the severity of a log line's level, if it has one."""
+    # Most formats lead with the level, which a dict probe finds without regex
+    head = line.split(None, 1)
+    if head:
+        severity = _LEADING_TOKEN_SEVERITY.get(head[0].strip(_TOKEN_PUNCTUATION))
+        if severity is not None:
+            return severity
+
+    match = _LEVEL_RE.search(line)
+    if match is None or match.lastindex is None:
         return None
+    return _GROUP_SEVERITY[match.lastindex]
+
+
+def _compile(pattern: str | re.Pattern[str], flags: int) -> re.Pattern[str]:
+    """Compile a filter pattern; precompiled patterns are used as given."""
+    if isinstance(pattern, re.Pattern):
+        return pattern
+    return _compile_cached(pattern, flags)
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_cached(pattern: str, flags: int) -> re.Pattern[str]:
+    """Compile a pattern string, reusing it across filters."""
+    return re.compile(pattern, flags)
+
+
+def split_lines(log_output: str) -> list[str]:
+    """Split log output into lines that can be passed to several filters."""
+    return log_output.splitlines()
 
 
 def filter_logs(
-    log_output: str,
+    log_output: str | list[str],
     min_level: str | None = None,
-    pattern: str | None = None,
-    exclude_pattern: str | None = None,
+    pattern: str | re.Pattern[str] | None = None,
+    exclude_pattern: str | re.Pattern[str] | None = None,
     case_sensitive: bool = False,
     context_lines: int = 0,
 ) -> str:
-    """Convenience function to filter logs."""
+    """Convenience function to filter logs.
+
+    Patterns may be passed precompiled, in which case their own flags apply
+    and case_sensitive is ignored for them.
+    """
     options = FilterOptions(
         min_level=LogLevel(min_level) if min_level else None,
         pattern=pattern,
@@ -0,0 +1,62 @@
+"""Subprocess helpers for the CLI-backed tools."""
+
+import asyncio
+from collections.abc import AsyncIterator, Sequence
+
+# Stream buffer size; structured log lines with stack traces often exceed the 64 KiB default
+_STREAM_LIMIT = 1 << 20
+
+
+async def stream_lines(
+    cmd: Sequence[str], error_prefix: str = "Command failed", cwd: str | None = None
+) -> AsyncIterator[str]:
+    """Run a command and yield its stdout line by line as it is produced.
+
+    stderr is drained concurrently so the process never blocks on a full pipe,
+    and becomes the error message if the command exits non-zero. The process
+    is killed if the caller stops iterating early.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        limit=_STREAM_LIMIT,
+    )
+    assert process.stdout is not None and process.stderr is not None
+    stderr_task = asyncio.ensure_future(process.stderr.read())
+
+    try:
+        async for line in _read_lines(process.stdout):
+            yield line.decode("utf-8", errors="replace").rstrip("\r\n")
+        stderr = await stderr_task
+        returncode = await process.wait()
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        stderr_task.cancel()
+
+    if returncode != 0:
+        error_msg = stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"{error_prefix}: {error_msg}")
+
+
+async def _read_lines(reader: asyncio.StreamReader) -> AsyncIterator[bytes]:
+    """Yield lines from a stream, including lines longer than its buffer limit."""
+    pending = b""
+    while True:
+        try:
+            line = await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            # End of stream, possibly after a last line without a newline
+            if pending or e.partial:
+                yield pending + e.partial
+            return
+        except asyncio.LimitOverrunError as e:
+            # Oversized line: set aside what is buffered and keep reading the rest
+            pending += await reader.readexactly(e.consumed)
+            continue
+
+        yield pending + line
+        pending = b""
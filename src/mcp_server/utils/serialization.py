@@ -0,0 +1,29 @@
+"""JSON serialization helpers with an optional orjson fast path."""
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def to_json(obj: Any, default: Callable[[Any], Any] | None = None) -> str:
+    """Serialize an object to indented JSON, using orjson when it is installed.
+
+    ``default`` converts values neither serializer handles natively.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2, default=default)
+
+
+def from_json(data: str | bytes) -> Any:
+    """Parse JSON text, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
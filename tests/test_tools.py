@@ -1,8 +1,35 @@
 """Tests for MCP tools."""
 
+import asyncio
+import json
+import re
+import sys
+from datetime import timedelta
+from types import SimpleNamespace
+
 import pytest
+from mcp.types import GetPromptRequest, ReadResourceRequest, TextContent, Tool
+from pydantic import ValidationError
 
-from mcp_server.utils.log_filter import filter_logs, LogLevel
+from mcp_server.resources import register_config_resources, register_data_resources
+from mcp_server.resources.registry import ResourceRegistry
+from mcp_server.server import create_server
+from mcp_server.tools import azure_insights, docker_compose, file_operations, kubernetes
+from mcp_server.tools.azure_insights import (
+    MetricsQueryInput,
+    _format_table_results,
+    _kql_string,
+    _parse_timespan,
+)
+from mcp_server.tools.docker import _build_docker_command, _exec_argv
+from mcp_server.tools.file_operations import ReadFileInput, _list_directory_sync, _read_file
+from mcp_server.tools.registry import ToolRegistry
+from mcp_server.utils import process
+from mcp_server.utils.batcher import AsyncBatcher
+from mcp_server.utils.cache import TTLCache
+from mcp_server.utils.log_filter import filter_logs, split_lines
+from mcp_server.utils.process import stream_lines
+from mcp_server.utils.serialization import from_json, to_json
 
 
 class TestLogFilter:
@@ -32,3 +59,544 @@ class TestLogFilter:
         assert "db failed" in result
         assert "health" not in result
         assert "DEBUG" not in result
+
+    def test_filter_pre_split_lines(self):
+        lines = split_lines("INFO starting\nERROR db failed\nWARN slow query")
+        assert filter_logs(lines, min_level="error") == "ERROR db failed"
+        assert filter_logs(lines, pattern="slow") == "WARN slow query"
+
+    def test_filter_uses_leading_level(self):
+        logs = "[INFO] trace id=42\nERROR: debug dump failed"
+        assert filter_logs(logs, min_level="info") == logs
+        assert filter_logs(logs, min_level="error") == "ERROR: debug dump failed"
+
+    def test_filter_context_lines(self):
+        logs = "a\nb\nERROR x\nc\nd\ne\nERROR y"
+        assert filter_logs(logs, pattern="ERROR", context_lines=1) == "b\nERROR x\nc\ne\nERROR y"
+
+    def test_filter_context_keeps_repeated_lines(self):
+        logs = "retrying\nERROR timeout\nretrying\nERROR timeout"
+        assert filter_logs(logs, pattern="ERROR", context_lines=1) == logs
+
+    def test_filter_overlapping_context_emitted_once(self):
+        logs = "a\nERROR x\nERROR y\nb"
+        assert filter_logs(logs, pattern="ERROR", context_lines=2) == logs
+
+    def test_filter_uses_first_level_in_line(self):
+        logs = "10:00:00 ERROR trace dump follows\n10:00:01 DEBUG error count=0"
+        assert filter_logs(logs, min_level="error") == "10:00:00 ERROR trace dump follows"
+
+    def test_filter_include_and_exclude(self):
+        logs = "GET /api 200\nGET /health 200\nPOST /api 500"
+        result = filter_logs(logs, pattern="/api|/health", exclude_pattern="health")
+        assert result == "GET /api 200\nPOST /api 500"
+
+    def test_filter_without_options_keeps_everything(self):
+        assert filter_logs("a\nb") == "a\nb"
+
+    def test_filter_with_compiled_pattern(self):
+        logs = "INFO Database up\nINFO database down"
+        result = filter_logs(logs, pattern=re.compile("database"))
+        assert result == "INFO database down"
+
+
+class TestToolRegistry:
+    """Tests for merging tool handlers across modules."""
+
+    @staticmethod
+    def _register(registry: ToolRegistry, tool_name: str) -> None:
+        @registry.list_tools()
+        async def list_tools() -> list[Tool]:
+            return [Tool(name=tool_name, inputSchema={"type": "object"})]
+
+        @registry.call_tool()
+        async def call_tool(name, arguments):
+            return [TextContent(type="text", text=f"{tool_name}:{name}")]
+
+    async def test_lists_tools_from_all_modules(self):
+        registry = ToolRegistry()
+        self._register(registry, "first")
+        self._register(registry, "second")
+        tools = await registry.list_all()
+        assert [tool.name for tool in tools] == ["first", "second"]
+
+    async def test_dispatches_to_owning_module(self):
+        registry = ToolRegistry()
+        self._register(registry, "first")
+        self._register(registry, "second")
+        result = await registry.call("second", {})
+        assert result[0].text == "second:second"
+
+    async def test_unknown_tool(self):
+        registry = ToolRegistry()
+        self._register(registry, "first")
+        with pytest.raises(ValueError, match="Unknown tool"):
+            await registry.call("missing", {})
+
+
+class TestResourceRegistry:
+    """Tests for merging resource handlers across modules."""
+
+    @staticmethod
+    def _registry() -> ResourceRegistry:
+        registry = ResourceRegistry()
+        register_config_resources(registry)
+        register_data_resources(registry)
+        return registry
+
+    async def test_lists_resources_from_all_modules(self):
+        resources = await self._registry().list_all()
+        uris = {str(resource.uri) for resource in resources}
+        assert uris == {"config://server", "config://environment", "data://status"}
+
+    async def test_reads_resource_from_owning_module(self):
+        result = await self._registry().read("data://status")
+        assert '"status": "running"' in result[0].content
+
+    async def test_unknown_resource(self):
+        with pytest.raises(ValueError, match="Unknown resource"):
+            await self._registry().read("data://missing")
+
+    @pytest.mark.parametrize("uri", ["config://server", "config://environment", "data://status"])
+    async def test_reads_resource_through_server(self, uri):
+        server = create_server()
+        handler = server.request_handlers[ReadResourceRequest]
+        request = ReadResourceRequest(method="resources/read", params={"uri": uri})
+
+        result = await handler(request)
+
+        contents = result.root.contents
+        assert contents[0].mimeType == "application/json"
+        assert json.loads(contents[0].text)
+
+
+class TestPrompts:
+    """Tests for prompt templates served through the MCP server."""
+
+    @pytest.mark.parametrize(
+        ("name", "arguments", "expected"),
+        [
+            ("code_review", {"code": "x = 1", "language": "python"}, "```python\nx = 1\n```"),
+            ("explain_error", {"error": "KeyError: 'id'"}, "KeyError: 'id'"),
+        ],
+    )
+    async def test_gets_prompt_through_server(self, name, arguments, expected):
+        server = create_server()
+        handler = server.request_handlers[GetPromptRequest]
+        request = GetPromptRequest(
+            method="prompts/get", params={"name": name, "arguments": arguments}
+        )
+
+        result = await handler(request)
+
+        assert result.root.description
+        assert expected in result.root.messages[0].content.text
+
+
+class TestAsyncBatcher:
+    """Tests for batching concurrent calls."""
+
+    async def test_identical_calls_processed_once(self):
+        batches = []
+
+        async def process(keys):
+            batches.append(keys)
+            return [f"result:{key}" for key in keys]
+
+        batcher = AsyncBatcher(process)
+        results = await asyncio.gather(*(batcher.submit("ps") for _ in range(3)))
+        assert results == ["result:ps"] * 3
+        assert batches == [["ps"]]
+
+    async def test_distinct_calls_share_a_batch(self):
+        batches = []
+
+        async def process(keys):
+            batches.append(keys)
+            return [key.upper() for key in keys]
+
+        batcher = AsyncBatcher(process)
+        results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+        assert results == ["A", "B"]
+        assert batches == [["a", "b"]]
+
+    async def test_flushes_when_batch_is_full(self):
+        batches = []
+
+        async def process(keys):
+            batches.append(keys)
+            return keys
+
+        batcher = AsyncBatcher(process, max_batch_size=2, max_queue_time=0.05)
+        results = await asyncio.gather(*(batcher.submit(key) for key in "abc"))
+        assert results == ["a", "b", "c"]
+        assert batches == [["a", "b"], ["c"]]
+
+    async def test_errors_are_raised_per_key(self):
+        async def process(keys):
+            return [ValueError(key) if key == "bad" else key for key in keys]
+
+        batcher = AsyncBatcher(process)
+        good, bad = await asyncio.gather(
+            batcher.submit("good"), batcher.submit("bad"), return_exceptions=True
+        )
+        assert good == "good"
+        assert isinstance(bad, ValueError)
+
+    async def test_wrong_result_count_fails_every_call(self):
+        async def process(keys):
+            return keys[:1]
+
+        batcher = AsyncBatcher(process)
+        results = await asyncio.gather(
+            batcher.submit("a"), batcher.submit("b"), return_exceptions=True
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def test_cancelled_batch_cancels_waiting_calls(self):
+        started = asyncio.Event()
+
+        async def process(keys):
+            started.set()
+            await asyncio.sleep(10)
+            return keys
+
+        batcher = AsyncBatcher(process)
+        call = asyncio.ensure_future(batcher.submit("a"))
+        await started.wait()
+        for task in batcher._running:
+            task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(call, timeout=1)
+
+
+class TestParseTimespan:
+    """Tests for ISO 8601 duration parsing."""
+
+    @pytest.mark.parametrize(
+        ("timespan", "expected"),
+        [
+            ("PT1H", timedelta(hours=1)),
+            ("PT5M", timedelta(minutes=5)),
+            ("PT30S", timedelta(seconds=30)),
+            ("P1D", timedelta(days=1)),
+            ("P2W", timedelta(weeks=2)),
+            ("P1DT12H", timedelta(days=1, hours=12)),
+        ],
+    )
+    def test_valid_durations(self, timespan, expected):
+        assert _parse_timespan(timespan) == expected
+
+    @pytest.mark.parametrize("timespan", ["", "P", "PT", "1H", "PT1X", "P1H"])
+    def test_invalid_durations(self, timespan):
+        with pytest.raises(ValueError, match="Invalid ISO 8601 duration"):
+            _parse_timespan(timespan)
+
+    def test_invalid_duration_fails_input_validation(self):
+        with pytest.raises(ValidationError, match="Invalid ISO 8601 duration"):
+            MetricsQueryInput(metric_name="requests/count", interval="5m")
+
+
+class TestTTLCache:
+    """Tests for the expiring result cache."""
+
+    def test_returns_stored_value(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("query", "result")
+        assert cache.get("query") == "result"
+        assert cache.get("missing") is None
+
+    def test_entries_expire(self):
+        cache = TTLCache(maxsize=2, ttl=0)
+        cache.set("query", "result")
+        assert cache.get("query") is None
+
+    def test_evicts_oldest_entry(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        assert cache.get("a") is None
+        assert cache.get("c") == 3
+
+
+class TestKqlString:
+    """Tests for quoting values into KQL queries."""
+
+    def test_plain_value(self):
+        assert _kql_string("NullReference") == '"NullReference"'
+
+    def test_quotes_cannot_break_out(self):
+        assert _kql_string('x" or 1==1 //') == '"x\\" or 1==1 //"'
+
+    def test_backslashes_and_newlines_are_escaped(self):
+        assert _kql_string("C:\\temp\nnext") == '"C:\\\\temp\\nnext"'
+
+
+class TestStreamLines:
+    """Tests for streaming subprocess output."""
+
+    async def test_yields_stdout_lines(self):
+        cmd = [sys.executable, "-c", "print('one'); print('two')"]
+        assert [line async for line in stream_lines(cmd)] == ["one", "two"]
+
+    async def test_runs_in_cwd(self, tmp_path):
+        cmd = [sys.executable, "-c", "import os; print(os.getcwd())"]
+        assert [line async for line in stream_lines(cmd, cwd=str(tmp_path))] == [str(tmp_path)]
+
+    async def test_lines_longer_than_buffer(self, monkeypatch):
+        monkeypatch.setattr(process, "_STREAM_LIMIT", 16)
+        cmd = [sys.executable, "-c", "print('x' * 100); print('y', end='')"]
+        assert [line async for line in stream_lines(cmd)] == ["x" * 100, "y"]
+
+    async def test_invalid_utf8_is_replaced(self):
+        cmd = [sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'caf\\xe9\\n')"]
+        assert [line async for line in stream_lines(cmd)] == ["caf\ufffd"]
+
+    async def test_failure_raises_with_stderr(self):
+        cmd = [sys.executable, "-c", "import sys; sys.exit('boom')"]
+        with pytest.raises(RuntimeError, match="Command failed: boom"):
+            [line async for line in stream_lines(cmd)]
+
+
+class TestBuildDockerCommand:
+    """Tests for building docker CLI commands."""
+
+    def test_local(self):
+        assert _build_docker_command(None, "ps", "--all") == ["docker", "ps", "--all"]
+
+    def test_remote_host(self):
+        cmd = _build_docker_command("ssh://user@remote", "ps")
+        assert cmd == ["docker", "--host", "ssh://user@remote", "ps"]
+
+
+class TestExecArgv:
+    """Tests for building docker exec argv."""
+
+    def test_simple_command_runs_without_shell(self):
+        assert _exec_argv("ls -la '/var/log/my app'") == ["ls", "-la", "/var/log/my app"]
+
+    def test_shell_syntax_uses_shell(self):
+        assert _exec_argv("ps aux | grep nginx") == ["sh", "-c", "ps aux | grep nginx"]
+        assert _exec_argv("echo $HOME") == ["sh", "-c", "echo $HOME"]
+
+    def test_env_assignment_uses_shell(self):
+        command = "RAILS_ENV=production rails db:migrate"
+        assert _exec_argv(command) == ["sh", "-c", command]
+
+    @pytest.mark.parametrize(
+        "command", ["cd /app", "export FOO=bar", "source .env", ". .env", "ulimit -n", "umask"]
+    )
+    def test_shell_builtin_uses_shell(self, command):
+        assert _exec_argv(command) == ["sh", "-c", command]
+
+
+class TestToJson:
+    """Tests for JSON serialization."""
+
+    def test_indented_output(self):
+        assert to_json({"a": [1]}) == '{\n  "a": [\n    1\n  ]\n}'
+
+    def test_from_json_accepts_bytes(self):
+        assert from_json(b'{"app": "web"}') == {"app": "web"}
+
+    def test_default_for_unsupported_types(self):
+        assert to_json({"value": {1}}, default=sorted) == '{\n  "value": [\n    1\n  ]\n}'
+
+
+class TestFormatTableResults:
+    """Tests for Kusto table formatting."""
+
+    @staticmethod
+    def _table(columns, rows):
+        return SimpleNamespace(columns=[SimpleNamespace(name=c) for c in columns], rows=rows)
+
+    def test_single_table_is_columnar(self):
+        table = self._table(["name", "count"], [("GET /", 3), ("POST /", 1)])
+        assert json.loads(_format_table_results([table])) == {
+            "columns": ["name", "count"],
+            "rows": [["GET /", 3], ["POST /", 1]],
+        }
+
+    def test_multiple_tables_are_listed(self):
+        tables = [self._table(["a"], [(1,)]), self._table(["b"], [(2,)])]
+        result = json.loads(_format_table_results(tables))
+        assert [t["columns"] for t in result] == [["a"], ["b"]]
+
+    def test_no_tables(self):
+        assert _format_table_results([]) == "No results found."
+
+
+class TestRunKustoQuery:
+    """Tests for running Kusto queries through the batcher and cache."""
+
+    @pytest.mark.skipif(not azure_insights.AZURE_SDK_AVAILABLE, reason="Azure SDK not installed")
+    async def test_partial_results_report_error_and_are_not_cached(self, monkeypatch):
+        calls = []
+        table = SimpleNamespace(columns=[SimpleNamespace(name="n")], rows=[(1,)])
+        partial = SimpleNamespace(
+            status=azure_insights.LogsQueryStatus.PARTIAL,
+            partial_data=[table],
+            partial_error=SimpleNamespace(message="result set too large"),
+        )
+
+        async def query_batch(requests):
+            calls.append(requests)
+            return [partial] * len(requests)
+
+        monkeypatch.setattr(
+            azure_insights, "_get_logs_client", lambda: SimpleNamespace(query_batch=query_batch)
+        )
+        azure_insights._query_cache.clear()
+        query = azure_insights.KustoQueryInput(query="requests", workspace_id="ws")
+
+        for _ in range(2):
+            output = await azure_insights._run_kusto_query(query)
+            assert output.startswith("Partial results, Kusto query failed: result set too large")
+            assert '"rows"' in output
+        assert len(calls) == 2
+
+
+class TestListDirectory:
+    """Tests for directory listings."""
+
+    def test_lists_entries_sorted_by_name(self, tmp_path):
+        (tmp_path / "b.txt").write_text("hello")
+        (tmp_path / "a").mkdir()
+        assert _list_directory_sync(str(tmp_path)) == "dir\t-\ta\nfile\t5\tb.txt"
+
+    def test_empty_directory(self, tmp_path):
+        assert _list_directory_sync(str(tmp_path)) == "(empty directory)"
+
+    def test_missing_directory(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            _list_directory_sync(str(tmp_path / "missing"))
+
+
+class TestReadFile:
+    """Tests for reading files."""
+
+    async def test_reads_file(self, tmp_path):
+        path = tmp_path / "app.log"
+        path.write_text("line 1\nline 2\n")
+        assert await _read_file(ReadFileInput(path=str(path))) == "line 1\nline 2\n"
+
+    async def test_truncates_large_file(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(file_operations, "_MAX_READ_BYTES", 4)
+        path = tmp_path / "app.log"
+        path.write_text("abcdefgh")
+        assert (await _read_file(ReadFileInput(path=str(path)))).startswith("abcd\n... (truncated")
+
+    async def test_directory_is_rejected(self, tmp_path):
+        with pytest.raises(ValueError, match="not a file"):
+            await _read_file(ReadFileInput(path=str(tmp_path)))
+
+
+class TestBuildKubectlCommand:
+    """Tests for building kubectl commands."""
+
+    def test_context_and_namespace(self):
+        cmd = kubernetes._build_kubectl_command("prod", "web", "get", "pods")
+        assert cmd == ["kubectl", "--context", "prod", "--namespace", "web", "get", "pods"]
+
+    def test_all_namespaces(self):
+        cmd = kubernetes._build_kubectl_command(None, "all", "get", "pods")
+        assert cmd == ["kubectl", "--all-namespaces", "get", "pods"]
+
+
+class TestDeploymentSelector:
+    """Tests for resolving a deployment's pod selector."""
+
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        kubernetes._selector_cache.clear()
+
+    async def test_uses_match_labels(self, monkeypatch):
+        async def run(cmd):
+            return '{"spec": {"selector": {"matchLabels": {"app": "web", "tier": "api"}}}}'
+
+        monkeypatch.setattr(kubernetes, "_run_kubectl_command", run)
+        selector = await kubernetes._get_deployment_selector(None, "default", "web")
+        assert selector == "app=web,tier=api"
+
+    async def test_falls_back_to_app_label(self, monkeypatch):
+        calls = []
+
+        async def run(cmd):
+            calls.append(cmd)
+            return "not json"
+
+        monkeypatch.setattr(kubernetes, "_run_kubectl_command", run)
+        for _ in range(2):
+            assert await kubernetes._get_deployment_selector(None, "default", "web") == "app=web"
+        assert len(calls) == 2
+
+    async def test_selector_is_cached(self, monkeypatch):
+        calls = []
+
+        async def run(cmd):
+            calls.append(cmd)
+            return '{"spec": {"selector": {"matchLabels": {"app": "web"}}}}'
+
+        monkeypatch.setattr(kubernetes, "_run_kubectl_command", run)
+        for _ in range(2):
+            assert await kubernetes._get_deployment_selector("prod", "default", "web") == "app=web"
+        assert len(calls) == 1
+
+
+class TestDeploymentLogs:
+    """Tests for reading logs across a deployment's pods."""
+
+    @pytest.fixture
+    def pods(self, monkeypatch):
+        failing: set[str] = set()
+
+        async def selector(context, namespace, deployment):
+            return "app=web"
+
+        async def run(cmd):
+            return "pod/web-1\npod/web-2\n"
+
+        async def stream(cmd, error_prefix):
+            for pod in failing:
+                if pod in cmd:
+                    raise RuntimeError("kubectl command failed: container not ready")
+            yield "INFO started"
+
+        monkeypatch.setattr(kubernetes, "_get_deployment_selector", selector)
+        monkeypatch.setattr(kubernetes, "_run_kubectl_command", run)
+        monkeypatch.setattr(kubernetes, "stream_lines", stream)
+        return failing
+
+    async def test_merges_prefixed_pod_logs(self, pods):
+        pods.add("pod/web-2")
+        output = await kubernetes._get_deployment_logs(
+            kubernetes.DeploymentLogsInput(deployment="web")
+        )
+        assert output == (
+            "[pod/web-1] INFO started\n[pod/web-2] kubectl command failed: container not ready"
+        )
+
+    async def test_filter_keeps_pod_errors(self, pods):
+        pods.add("pod/web-2")
+        output = await kubernetes._get_deployment_logs(
+            kubernetes.DeploymentLogsInput(deployment="web", min_level="error")
+        )
+        assert output == "[pod/web-2] kubectl command failed: container not ready"
+
+    async def test_all_pods_failing_raises(self, pods):
+        pods.update({"pod/web-1", "pod/web-2"})
+        with pytest.raises(RuntimeError, match="container not ready"):
+            await kubernetes._get_deployment_logs(kubernetes.DeploymentLogsInput(deployment="web"))
+
+
+class TestComposeActionCommand:
+    """Tests for running compose actions."""
+
+    async def test_returns_progress_from_stderr(self):
+        cmd = [sys.executable, "-c", "import sys; print('ignored'); sys.stderr.write('Started')"]
+        assert await docker_compose._run_compose_action_command(cmd) == "Started"
+
+    async def test_quiet_success(self):
+        assert await docker_compose._run_compose_action_command([sys.executable, "-c", ""]) == "OK"